@@ -0,0 +1,47 @@
+"""
+Django management command to move past activities into the archive collections
+Run it from cron, or keep it running with --every to archive on a schedule
+"""
+
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from mongo_utils import connect_to_mongodb, get_mongodb_connection
+from mongo_archive import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, archive_expired_activities, ensure_archive_indexes
+
+
+class Command(BaseCommand):
+    help = 'Move activities whose date has passed, and their participations, to the archive collections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before-days', type=int, default=ARCHIVE_AFTER_DAYS,
+                            help='Archive activities dated more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE,
+                            help='Activities moved per batch')
+        parser.add_argument('--every', type=int, metavar='MINUTES',
+                            help='Keep running and archive again every MINUTES')
+
+    def handle(self, *args, **options):
+        # Ensure MongoDB connection
+        connect_to_mongodb()
+
+        if not get_mongodb_connection():
+            self.stdout.write(
+                self.style.ERROR('Failed to connect to MongoDB. Please check your MongoDB connection.')
+            )
+            return
+
+        ensure_archive_indexes()
+        while True:
+            before = datetime.utcnow() - timedelta(days=options['before_days'])
+            activities, participations = archive_expired_activities(before, options['batch_size'])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Archived {activities} activities dated before {before:%Y-%m-%d %H:%M} '
+                    f'and {participations} participations'
+                )
+            )
+            if not options['every']:
+                break
+            time.sleep(options['every'] * 60)
@@ -0,0 +1,74 @@
+"""
+Django management command to backfill GeoJSON points from latitude/longitude
+start.sh runs it on every deploy; documents that already have a point are skipped
+Each collection is updated with a single server-side pipeline update, so no
+documents are loaded into Python
+"""
+
+from django.core.management.base import BaseCommand
+from mongo_utils import connect_to_mongodb, get_mongodb_connection
+from mongo_models import User as MongoUser, Item as MongoItem, Activity as MongoActivity, Listing
+
+# (document, path of the embedded document holding the coordinates, or '' for top level)
+GEO_DOCUMENTS = (
+    (MongoItem, ''),
+    (MongoActivity, ''),
+    (Listing, ''),
+    (MongoUser, 'address.'),
+)
+
+
+def backfill_filter(prefix, force=False):
+    """Documents with valid coordinates (and, unless forced, no point yet)"""
+    query = {
+        f'{prefix}latitude': {'$type': 'number', '$gte': -90, '$lte': 90},
+        f'{prefix}longitude': {'$type': 'number', '$gte': -180, '$lte': 180},
+    }
+    if not force:
+        query[f'{prefix}point'] = {'$exists': False}
+    return query
+
+
+def backfill_update(prefix):
+    """Pipeline update building the point from the document's own fields"""
+    return [{'$set': {f'{prefix}point': {
+        'type': 'Point',
+        'coordinates': [f'${prefix}longitude', f'${prefix}latitude'],
+    }}}]
+
+
+class Command(BaseCommand):
+    help = 'Fill the GeoJSON point fields used by "near me" browsing from the stored latitude/longitude'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Recompute points that already exist')
+
+    def handle(self, *args, **options):
+        # Ensure MongoDB connection
+        connect_to_mongodb()
+
+        if not get_mongodb_connection():
+            self.stdout.write(
+                self.style.ERROR('Failed to connect to MongoDB. Please check your MongoDB connection.')
+            )
+            return
+
+        for document, prefix in GEO_DOCUMENTS:
+            collection = document._get_collection()
+            try:
+                document.ensure_indexes()
+                result = collection.update_many(backfill_filter(prefix, options['force']), backfill_update(prefix))
+            except Exception as e:
+                self.stdout.write(
+                    self.style.ERROR(f'Error backfilling {collection.name}: {str(e)}')
+                )
+                continue
+
+            missing = collection.count_documents({f'{prefix}point': {'$exists': False}})
+            self.stdout.write(
+                self.style.SUCCESS(f'{collection.name}: {result.modified_count} points written')
+            )
+            if missing:
+                self.stdout.write(
+                    self.style.WARNING(f'{collection.name}: {missing} documents have no usable coordinates')
+                )
@@ -0,0 +1,128 @@
+"""
+Django management command to compare full document loading with projection-only rows
+Seeds a throwaway database with synthetic activities, so it never touches real data
+"""
+
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from django.core.management.base import BaseCommand
+from mongoengine.connection import get_connection, get_db
+from mongo_utils import connect_to_mongodb, get_mongodb_connection
+from mongo_models import Activity as MongoActivity
+from mongo_projection import Row, ACTIVITY_LIST_FIELDS
+
+WORDS = [
+    'community', 'garden', 'cleanup', 'food', 'bank', 'shelter', 'tutoring', 'kids', 'seniors',
+    'park', 'beach', 'library', 'drive', 'collection', 'weekend', 'morning', 'volunteers',
+    'help', 'sorting', 'delivery', 'painting', 'repair', 'event', 'neighborhood', 'support',
+]
+CATEGORIES = ['Environment', 'Education', 'Health', 'Community', 'Animals', 'Other']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark full MongoEngine documents against projected rows on a seeded activities collection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', help='Collection sizes to seed', default=[10000, 100000])
+        parser.add_argument('--page-size', type=int, help='Rows per page', default=12)
+        parser.add_argument('--repeat', type=int, help='Pages loaded per approach', default=50)
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark database afterwards')
+
+    def handle(self, *args, **options):
+        # Ensure MongoDB connection
+        connect_to_mongodb()
+
+        if not get_mongodb_connection():
+            self.stdout.write(
+                self.style.ERROR('Failed to connect to MongoDB. Please check your MongoDB connection.')
+            )
+            return
+
+        db_name = f'{get_db().name}_projection_benchmark'
+        collection = get_connection()[db_name][MongoActivity._get_collection_name()]
+        projection = dict.fromkeys(ACTIVITY_LIST_FIELDS, 1)
+
+        try:
+            self.stdout.write(
+                f"{'documents':>10}{'approach':>12}{'page ms':>10}{'page KiB':>10}{'scan s':>10}{'scan MiB':>10}"
+            )
+            for size in options['sizes']:
+                self._seed(collection, size)
+                for approach, fields, load in (
+                    ('documents', None, MongoActivity._from_son),
+                    ('projected', projection, Row),
+                ):
+                    page_ms, page_kib = self._measure_page(collection, fields, load, options)
+                    scan_s, scan_mib = self._measure_scan(collection, fields, load)
+                    self.stdout.write(
+                        f'{size:>10}{approach:>12}{page_ms:>10.2f}{page_kib:>10.1f}{scan_s:>10.2f}{scan_mib:>10.1f}'
+                    )
+        finally:
+            if not options['keep']:
+                get_connection().drop_database(db_name)
+
+    def _seed(self, collection, count):
+        collection.drop()
+        collection.create_index([('created_at', -1), ('_id', -1)])
+
+        rng = random.Random(42)
+        now = datetime.utcnow()
+        batch = []
+        for i in range(count):
+            batch.append({
+                'title': ' '.join(rng.sample(WORDS, 4)),
+                # Long free-text fields are what the list pages never render in full
+                'description': ' '.join(rng.choices(WORDS, k=150)),
+                'requirements': ' '.join(rng.choices(WORDS, k=80)),
+                'contact_info': f'organizer{i}@example.org',
+                'category': rng.choice(CATEGORIES),
+                'location': f'{rng.randint(1, 200)} Main Street',
+                'latitude': rng.uniform(29.5, 33.3),
+                'longitude': rng.uniform(34.2, 35.9),
+                'volunteer_id': ObjectId(),
+                'created_at': now - timedelta(minutes=i),
+                'activity_date': now + timedelta(days=rng.randint(1, 90)),
+                'duration_hours': rng.randint(1, 8),
+                'max_participants': rng.randint(1, 30),
+                'status': 'available',
+            })
+            if len(batch) == 5000:
+                collection.insert_many(batch)
+                batch = []
+        if batch:
+            collection.insert_many(batch)
+        self.stdout.write(self.style.SUCCESS(f'Seeded {count} activities into {collection.full_name}'))
+
+    def _measure_page(self, collection, fields, load, options):
+        """Median time and peak allocation for loading one page from a random depth"""
+        rng = random.Random(7)
+        total = collection.estimated_document_count()
+        timings, peaks = [], []
+        for _ in range(options['repeat']):
+            skip = rng.randrange(max(total - options['page_size'], 1))
+            tracemalloc.start()
+            started = time.perf_counter()
+            rows = [load(doc) for doc in
+                    collection.find({}, fields).sort([('created_at', -1), ('_id', -1)])
+                    .skip(skip).limit(options['page_size'])]
+            timings.append((time.perf_counter() - started) * 1000)
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+            del rows
+        return statistics.median(timings), statistics.median(peaks)
+
+    def _measure_scan(self, collection, fields, load):
+        """Time and peak allocation for loading the whole collection, e.g. an unpaginated dashboard"""
+        tracemalloc.start()
+        started = time.perf_counter()
+        rows = [load(doc) for doc in collection.find({}, fields)]
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+        del rows
+        return elapsed, peak
@@ -0,0 +1,107 @@
+"""
+Django management command to compare regex and text-index search on MongoDB
+Seeds a throwaway database with synthetic items, so it never touches real data
+"""
+
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from mongoengine.connection import get_connection, get_db
+from mongo_utils import connect_to_mongodb, get_mongodb_connection
+from mongo_models import Item as MongoItem
+from mongo_search import regex_match
+
+VOCABULARY = [
+    'chair', 'table', 'sofa', 'lamp', 'jacket', 'coat', 'shoes', 'boots', 'book', 'novel',
+    'textbook', 'laptop', 'phone', 'tablet', 'monitor', 'keyboard', 'stroller', 'crib',
+    'blanket', 'pillow', 'toy', 'puzzle', 'bicycle', 'helmet', 'kettle', 'pan', 'plate',
+    'winter', 'summer', 'wooden', 'leather', 'cotton', 'kids', 'adult', 'kitchen', 'office',
+    'garden', 'vintage', 'new', 'used', 'large', 'small', 'blue', 'red', 'green', 'black',
+]
+CATEGORIES = ['Electronics', 'Clothing', 'Books', 'Furniture', 'Toys', 'Other']
+CONDITIONS = ['New', 'Like New', 'Good', 'Fair', 'Poor']
+QUERIES = ['chair', 'winter jacket', 'wooden table', 'laptop', 'kids toy puzzle']
+SEARCH_FIELDS = ('name', 'description')
+PAGE_SIZE = 12
+
+
+class Command(BaseCommand):
+    help = 'Benchmark $regex search against the weighted text index on a seeded items collection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, help='Number of items to seed', default=100000)
+        parser.add_argument('--repeat', type=int, help='Runs per query and approach', default=20)
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark database afterwards')
+
+    def handle(self, *args, **options):
+        # Ensure MongoDB connection
+        connect_to_mongodb()
+
+        if not get_mongodb_connection():
+            self.stdout.write(
+                self.style.ERROR('Failed to connect to MongoDB. Please check your MongoDB connection.')
+            )
+            return
+
+        db_name = f'{get_db().name}_search_benchmark'
+        db = get_connection()[db_name]
+        collection = db[MongoItem._get_collection_name()]
+
+        try:
+            self._seed(collection, options['documents'])
+            self.stdout.write(f"{'query':<20}{'regex ms':>12}{'text ms':>12}{'regex docs':>14}{'text docs':>12}")
+            for query in QUERIES:
+                regex_ms, regex_docs = self._measure(db, collection, regex_match(query, SEARCH_FIELDS),
+                                                     None, options['repeat'])
+                text_ms, text_docs = self._measure(db, collection, {'$text': {'$search': query}},
+                                                   {'score': {'$meta': 'textScore'}}, options['repeat'])
+                self.stdout.write(f'{query:<20}{regex_ms:>12.2f}{text_ms:>12.2f}{regex_docs:>14}{text_docs:>12}')
+        finally:
+            if not options['keep']:
+                get_connection().drop_database(db_name)
+
+    def _seed(self, collection, count):
+        collection.drop()
+        for spec in MongoItem._meta['index_specs']:
+            spec = dict(spec)
+            collection.create_index(spec.pop('fields'), **spec)
+
+        rng = random.Random(42)
+        now = datetime.utcnow()
+        batch = []
+        for i in range(count):
+            batch.append({
+                'name': ' '.join(rng.sample(VOCABULARY, 3)),
+                'description': ' '.join(rng.choices(VOCABULARY, k=25)),
+                'category': rng.choice(CATEGORIES),
+                'condition': rng.choice(CONDITIONS),
+                'created_at': now - timedelta(minutes=i),
+            })
+            if len(batch) == 5000:
+                collection.insert_many(batch)
+                batch = []
+        if batch:
+            collection.insert_many(batch)
+        self.stdout.write(self.style.SUCCESS(f'Seeded {count} items into {collection.full_name}'))
+
+    def _measure(self, db, collection, query, projection, repeat):
+        """Median time for one catalog page plus its total count, and documents examined by the page query"""
+        sort = [('score', {'$meta': 'textScore'})] if projection else [('created_at', -1)]
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(collection.find(query, projection).sort(sort).limit(PAGE_SIZE))
+            collection.count_documents(query)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        explain = db.command('explain', {
+            'find': collection.name,
+            'filter': query,
+            'projection': projection or {},
+            'sort': dict(sort),
+            'limit': PAGE_SIZE,
+        }, verbosity='executionStats')
+        return statistics.median(timings), explain['executionStats']['totalDocsExamined']
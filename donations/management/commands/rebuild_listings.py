@@ -0,0 +1,55 @@
+"""
+Django management command to rebuild the MongoDB `listings` read model
+start.sh runs it with --if-empty on every deploy, so a fresh database (or one
+that predates the read model) gets its catalog before requests are served
+"""
+
+from django.core.management.base import BaseCommand
+from mongo_utils import connect_to_mongodb, get_mongodb_connection
+from mongo_models import Donation as MongoDonation, Listing
+from mongo_listings import rebuild_listings
+
+
+class Command(BaseCommand):
+    help = 'Backfill or repair the listings collection from donations and items'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--if-empty', action='store_true',
+                            help='Only rebuild when the listings collection has no documents')
+
+    def handle(self, *args, **options):
+        # Ensure MongoDB connection
+        connect_to_mongodb()
+
+        if not get_mongodb_connection():
+            self.stdout.write(
+                self.style.ERROR('Failed to connect to MongoDB. Please check your MongoDB connection.')
+            )
+            return
+
+        before = Listing.objects.count()
+        if options['if_empty'] and before:
+            self.stdout.write(f'Listings collection already has {before} documents, skipping rebuild')
+            return
+        available = MongoDonation.objects(status='available').count()
+
+        try:
+            after = rebuild_listings()
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error rebuilding listings: {str(e)}')
+            )
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt listings collection:\n'
+                f'Available donations: {available}\n'
+                f'Listings before: {before}\n'
+                f'Listings after: {after}'
+            )
+        )
+        if after != available:
+            self.stdout.write(
+                self.style.WARNING(f'{available - after} available donations have no matching item.')
+            )
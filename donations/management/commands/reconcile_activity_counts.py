@@ -0,0 +1,88 @@
+"""
+Django management command to reconcile Activity.joined_count with volunteer_activities
+The real counts come from one aggregation; activities that look drifted are
+recounted and re-read just before a conditional write, so only drift that
+holds steady across the whole check is repaired. start.sh runs it on every
+deploy, which also fills the counter of activities created before it existed
+"""
+
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+from mongo_utils import connect_to_mongodb, get_mongodb_connection
+from mongo_models import Activity as MongoActivity
+from mongo_participation import joined_counts
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Recompute the joined participant counter of every activity and repair drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without writing')
+
+    def handle(self, *args, **options):
+        # Ensure MongoDB connection
+        connect_to_mongodb()
+
+        if not get_mongodb_connection():
+            self.stdout.write(
+                self.style.ERROR('Failed to connect to MongoDB. Please check your MongoDB connection.')
+            )
+            return
+
+        counts = joined_counts()
+        collection = MongoActivity._get_collection()
+
+        checked = drifted = busy = 0
+        suspects = {}
+        for doc in collection.find({}, {'joined_count': 1}):
+            checked += 1
+            if doc.get('joined_count') != counts.get(doc['_id'], 0):
+                suspects[doc['_id']] = (doc.get('joined_count'), counts.get(doc['_id'], 0))
+            if len(suspects) == BATCH_SIZE:
+                repaired, skipped = self._repair(collection, suspects, options['dry_run'])
+                drifted, busy = drifted + repaired, busy + skipped
+                suspects = {}
+        if suspects:
+            repaired, skipped = self._repair(collection, suspects, options['dry_run'])
+            drifted, busy = drifted + repaired, busy + skipped
+
+        verb = 'would be repaired' if options['dry_run'] else 'repaired'
+        self.stdout.write(
+            self.style.SUCCESS(f'Checked {checked} activities, {drifted} counters {verb}')
+        )
+        if busy:
+            self.stdout.write(
+                self.style.WARNING(f'{busy} activities changed during the check and were left for the next run')
+            )
+
+    def _repair(self, collection, suspects, dry_run):
+        """
+        Recount and re-read `suspects` ({id: (scanned counter, scanned count)})
+        and write the ones whose counter and count are both unchanged, only
+        over the counter value that was read. Anything that moved meanwhile
+        (a join or leave in flight) is skipped. Returns (repaired, skipped).
+        """
+        ids = list(suspects)
+        current = {doc['_id']: doc.get('joined_count') for doc in collection.find({'_id': {'$in': ids}}, {'joined_count': 1})}
+        recounted = joined_counts(ids)
+
+        batch = []
+        skipped = 0
+        for activity_id, (scanned, expected) in suspects.items():
+            if activity_id not in current:
+                continue  # deleted meanwhile
+            if current[activity_id] != scanned or recounted.get(activity_id, 0) != expected:
+                skipped += 1
+                continue
+            batch.append(UpdateOne(
+                {'_id': activity_id, 'joined_count': scanned},
+                {'$set': {'joined_count': expected}},
+            ))
+        if batch and not dry_run:
+            result = collection.bulk_write(batch, ordered=False)
+            # A join/leave between the re-read and the write makes the filter miss
+            skipped += len(batch) - result.matched_count
+            return result.matched_count, skipped
+        return len(batch), skipped
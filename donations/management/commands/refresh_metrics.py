@@ -0,0 +1,41 @@
+"""
+Django management command to recompute the admin dashboard metrics snapshot
+Run it from cron, or keep it running with --every to refresh on a schedule
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from mongo_utils import connect_to_mongodb, get_mongodb_connection
+from mongo_metrics import refresh_metrics
+
+
+class Command(BaseCommand):
+    help = 'Recompute the headline counts shown on the admin dashboard'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=int, metavar='MINUTES',
+                            help='Keep running and refresh again every MINUTES')
+
+    def handle(self, *args, **options):
+        # Ensure MongoDB connection
+        connect_to_mongodb()
+
+        if not get_mongodb_connection():
+            self.stdout.write(
+                self.style.ERROR('Failed to connect to MongoDB. Please check your MongoDB connection.')
+            )
+            return
+
+        while True:
+            snapshot = refresh_metrics()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Metrics refreshed at {snapshot['computed_at']:%Y-%m-%d %H:%M:%S}: "
+                    f"{snapshot['total_users']} users, {snapshot['total_donations']} donations, "
+                    f"{snapshot['total_activities']} activities"
+                )
+            )
+            if not options['every']:
+                break
+            time.sleep(options['every'] * 60)
@@ -0,0 +1,158 @@
+"""
+Django management command to bring MongoDB indexes in line with mongo_models
+Creates declared indexes that are missing, drops the ones no longer declared
+and reports declared indexes that $indexStats has never seen used. An index
+that cannot be built (e.g. a unique index over duplicate rows) is reported and
+the remaining ones are still synced; the command then exits with an error.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from pymongo.errors import OperationFailure
+from mongo_utils import connect_to_mongodb, get_mongodb_connection
+from mongo_models import User as MongoUser, Donor as MongoDonor, Recipient as MongoRecipient, \
+    Volunteer as MongoVolunteer, Item as MongoItem, Donation as MongoDonation, \
+    Activity as MongoActivity, VolunteerActivity as MongoVolunteerActivity, Listing
+from mongo_archive import ensure_archive_indexes
+
+DOCUMENTS = (
+    MongoUser, MongoDonor, MongoRecipient, MongoVolunteer, MongoItem,
+    MongoDonation, MongoActivity, MongoVolunteerActivity, Listing,
+)
+
+
+def normalize_key(key):
+    """
+    Comparable form of an index key. The server stores a text index's fields
+    (as weights) sorted by name, so text fields are compared as a sorted set
+    whatever order they were declared in.
+    """
+    text_fields = sorted(field for field, direction in key if direction == 'text')
+    if not text_fields:
+        return list(key)
+    return [(field, direction) for field, direction in key if direction != 'text'] + \
+        [(field, 'text') for field in text_fields]
+
+
+def index_key(info):
+    """Key of an index_information() entry in the form Document.list_indexes() uses"""
+    if info['key'][0][0] == '_fts':
+        # Text indexes are declared by their fields, stored as _fts/_ftsx plus weights
+        return normalize_key([(field, 'text') for field in info['weights']])
+    return normalize_key(info['key'])
+
+
+class Command(BaseCommand):
+    help = 'Create missing MongoDB indexes, drop obsolete ones and report unused ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report changes without writing')
+        parser.add_argument('--keep-obsolete', action='store_true', help='Do not drop undeclared indexes')
+
+    def handle(self, *args, **options):
+        # Ensure MongoDB connection
+        connect_to_mongodb()
+
+        if not get_mongodb_connection():
+            self.stdout.write(
+                self.style.ERROR('Failed to connect to MongoDB. Please check your MongoDB connection.')
+            )
+            return
+
+        dry_run = options['dry_run']
+        failures = []
+        for document in DOCUMENTS:
+            try:
+                failures += self._sync(document, dry_run, options['keep_obsolete'])
+            except OperationFailure as e:
+                collection_name = document._get_collection_name()
+                self.stdout.write(self.style.ERROR(f'{collection_name}: sync failed ({e})'))
+                failures.append(collection_name)
+
+        if not dry_run:
+            try:
+                ensure_archive_indexes()
+            except OperationFailure as e:
+                self.stdout.write(self.style.ERROR(f'archive collections: sync failed ({e})'))
+                failures.append('archive collections')
+
+        if failures:
+            raise CommandError(f'Indexes could not be synced on: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('Indexes are in sync' if not dry_run else 'Dry run finished'))
+
+    def _sync(self, document, dry_run, keep_obsolete):
+        """Sync one collection's indexes; returns descriptions of the indexes that failed to build"""
+        collection = document._get_collection()
+        declared = [normalize_key(key) for key in document.list_indexes() if key != [('_id', 1)]]
+        existing = {name: index_key(info) for name, info in collection.index_information().items()
+                    if name != '_id_'}
+
+        missing = [key for key in declared if key not in existing.values()]
+        # Keys are normalized, so an index matching a declared one is never obsolete
+        obsolete = [name for name, key in existing.items() if key not in declared]
+
+        # A collection holds a single text index: one whose fields changed
+        # must go before its replacement can be created
+        replaced = [name for name in obsolete if self._is_text(existing[name])
+                    and any(self._is_text(key) for key in missing)]
+        if replaced:
+            self.stdout.write(self.style.WARNING(f'{collection.name}: replacing text index {", ".join(replaced)}'))
+            if not dry_run:
+                for name in replaced:
+                    collection.drop_index(name)
+            obsolete = [name for name in obsolete if name not in replaced]
+
+        failures = []
+        if missing:
+            self.stdout.write(f'{collection.name}: creating {self._keys(missing)}')
+            if not dry_run:
+                failures = self._create(document, collection, missing)
+
+        if obsolete and not keep_obsolete:
+            self.stdout.write(self.style.WARNING(f'{collection.name}: dropping {", ".join(obsolete)}'))
+            if not dry_run:
+                for name in obsolete:
+                    collection.drop_index(name)
+
+        self._report_unused(collection)
+        return failures
+
+    def _create(self, document, collection, missing):
+        """
+        Create the declared indexes whose keys are in `missing`, one at a time
+        with the options ensure_indexes() would use, so one failure does not
+        keep the others from being built
+        """
+        failures = []
+        for spec in document._meta['index_specs']:
+            spec = dict(spec)
+            fields = spec.pop('fields')
+            spec.pop('cls', None)
+            if normalize_key(fields) not in missing:
+                continue
+            try:
+                collection.create_index(fields, **dict(document._meta.get('index_opts') or {}, **spec))
+            except OperationFailure as e:
+                self.stdout.write(self.style.ERROR(f'{collection.name}: could not create {self._keys([fields])} ({e})'))
+                failures.append(f'{collection.name} {self._keys([fields])}')
+        return failures
+
+    def _is_text(self, key):
+        return any(direction == 'text' for _, direction in key)
+
+    def _keys(self, keys):
+        return ', '.join('(' + ', '.join(f'{field} {direction}' for field, direction in key) + ')' for key in keys)
+
+    def _report_unused(self, collection):
+        """Indexes with no recorded use since the server (or the index) started counting"""
+        try:
+            stats = list(collection.aggregate([{'$indexStats': {}}]))
+        except OperationFailure as e:
+            self.stdout.write(self.style.WARNING(f'{collection.name}: $indexStats unavailable ({e})'))
+            return
+        for stat in stats:
+            if stat['name'] != '_id_' and not stat['accesses']['ops']:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"{collection.name}: index {stat['name']} unused since {stat['accesses']['since']:%Y-%m-%d %H:%M}"
+                    )
+                )
@@ -0,0 +1,123 @@
+"""
+Joined MongoDB queries behind the admin tables
+Each table is served by one aggregation that joins only the rows it renders
+"""
+
+from mongo_models import User as MongoUser, Donation as MongoDonation
+from mongo_pagination import keyset_aggregate, ranked_aggregate
+from mongo_search import regex_match, search_match, search_sort, use_text_search
+from mongo_projection import ADMIN_DONATION_ITEM_FIELDS, ADMIN_USER_FIELDS
+from mongo_roles import ROLE_COLLECTIONS, role_lookup_stages, roles_from_doc
+
+ADMIN_PAGE_SIZE = 20
+
+
+def lookup_one(collection, local_field, as_field, fields=None):
+    """$lookup + $unwind stages joining at most one document, keeping rows without a match"""
+    lookup = {
+        'from': collection,
+        'localField': local_field,
+        'foreignField': '_id',
+        'as': as_field,
+    }
+    if fields:
+        lookup['pipeline'] = [{'$project': {field: 1 for field in fields}}]
+    return [
+        {'$lookup': lookup},
+        {'$unwind': {'path': f'${as_field}', 'preserveNullAndEmptyArrays': True}},
+    ]
+
+
+def donation_party_stages():
+    """Join the donor and recipient users of each donation row"""
+    return (
+        lookup_one('donors', 'donor_id', 'donor', ('user_id',))
+        + lookup_one('users', 'donor.user_id', 'donor_user', ('name', 'email'))
+        + lookup_one('recipients', 'recipient_id', 'recipient', ('user_id',))
+        + lookup_one('users', 'recipient.user_id', 'recipient_user', ('name', 'email'))
+    )
+
+
+def donation_row(doc):
+    """Flatten a joined donation into the dict shape the admin templates render"""
+    donor_user = doc.get('donor_user') or {}
+    recipient_user = doc.get('recipient_user') or {}
+    return {
+        'id': doc['_id'],
+        'status': doc.get('status'),
+        'created_at': doc.get('created_at'),
+        'item': doc.get('item'),
+        'donor_name': donor_user.get('name', 'Unknown'),
+        'donor_email': donor_user.get('email', 'Unknown'),
+        'recipient_name': recipient_user.get('name'),
+        'recipient_email': recipient_user.get('email'),
+    }
+
+
+def donation_table_page(params, status='', category='', search='', per_page=ADMIN_PAGE_SIZE):
+    """One keyset page of donations joined with their item, donor and recipient"""
+    match = {'status': status} if status else {}
+
+    item_match = {}
+    if category:
+        item_match['item.category'] = category
+    if search:
+        item_match.update(regex_match(search, ('item.name', 'item.description')))
+
+    item_stages = lookup_one('items', 'item_id', 'item', ADMIN_DONATION_ITEM_FIELDS)
+    if item_match:
+        # Item filters have to run before the limit, so the item is joined first
+        filter_stages, join_stages = item_stages + [{'$match': item_match}], donation_party_stages()
+    else:
+        filter_stages, join_stages = [], item_stages + donation_party_stages()
+
+    return keyset_aggregate(
+        MongoDonation, match, params, per_page,
+        filter_stages=filter_stages,
+        join_stages=join_stages,
+        wrap=donation_row,
+    )
+
+
+def user_row(doc):
+    """A user joined with its roles, in the dict shape the user management template renders"""
+    roles = roles_from_doc(doc['_id'], doc)
+    row = {'id': doc['_id']}
+    row.update({field: doc.get(field) for field in ADMIN_USER_FIELDS})
+    row.update(is_donor=roles.is_donor, is_recipient=roles.is_recipient, is_volunteer=roles.is_volunteer)
+    return row
+
+
+def user_table_page(params, status='', role='', search='', per_page=ADMIN_PAGE_SIZE):
+    """
+    One page of users with their roles. Status, role and search are all
+    applied inside one aggregation: status and search in the first $match,
+    the role as a $lookup on that profile collection before the limit.
+    Newest users first, keyset paged; text searches rank by relevance and
+    are paged by offset.
+    """
+    match = {'is_active': status == 'active'} if status in ('active', 'blocked') else {}
+
+    filter_stages = []
+    if role in ROLE_COLLECTIONS:
+        filter_stages = role_lookup_stages((role,)) + [{'$match': {role: {'$ne': []}}}]
+    other_roles = [other for other in ROLE_COLLECTIONS if other != role]
+    join_stages = role_lookup_stages(other_roles) + [
+        {'$project': dict.fromkeys(ADMIN_USER_FIELDS + tuple(ROLE_COLLECTIONS), 1)},
+    ]
+
+    if use_text_search(search):
+        return ranked_aggregate(MongoUser, [
+            {'$match': dict(search_match(search, ('name', 'email')), **match)},
+            {'$sort': search_sort(search, {'date_joined': -1, '_id': -1})},
+            *filter_stages,
+        ], params, per_page, wrap=user_row, join_stages=join_stages)
+
+    if search.strip():
+        match = dict(match, **regex_match(search, ('name', 'email')))
+    return keyset_aggregate(
+        MongoUser, match, params, per_page, sort_field='date_joined',
+        filter_stages=filter_stages,
+        join_stages=join_stages,
+        wrap=user_row,
+    )
@@ -0,0 +1,136 @@
+"""
+Aggregated statistics behind the admin dashboard panels
+Each panel is computed by aggregations whose count does not grow with the
+size of the collections or of the selected period
+"""
+
+from datetime import datetime, time, timedelta
+
+from mongo_cache import cached
+from mongo_models import User as MongoUser, Donation as MongoDonation, \
+    Activity as MongoActivity, VolunteerActivity as MongoVolunteerActivity
+from mongo_projection import Row
+from mongo_admin_queries import lookup_one
+from mongo_facets import ITEM_CATEGORIES, facets_from_groups
+from mongo_archive import ACTIVITY_ARCHIVE, PARTICIPATION_ARCHIVE
+
+STATS_NAMESPACE = 'admin_stats'
+LEADERBOARD_SIZE = 10
+LEADERBOARD_TTL = 60
+CATEGORY_STATS_TTL = 60
+# Statuses broken out per category; every status still counts towards the total
+CATEGORY_STATUSES = ('available', 'claimed', 'shipped')
+
+# Series name -> (document, date field, extra filter, archive collection of the same shape or None)
+TREND_SERIES = {
+    'activities_created': (MongoActivity, 'created_at', {}, ACTIVITY_ARCHIVE),
+    'activities_completed': (MongoVolunteerActivity, 'created_at', {'status': 'completed'}, PARTICIPATION_ARCHIVE),
+    'donations_created': (MongoDonation, 'created_at', {}, None),
+    'signups': (MongoUser, 'date_joined', {}, None),
+}
+
+
+def daily_counts(document, date_field, match, archive, start):
+    """
+    {date: count} of documents per UTC day since `start`; days without
+    documents are absent. Rows already moved to `archive` still count.
+    """
+    match = {'$match': dict(match, **{date_field: {'$gte': start}})}
+    union = [{'$unionWith': {'coll': archive, 'pipeline': [match]}}] if archive else []
+    groups = document.objects.aggregate([
+        match,
+        *union,
+        {'$group': {
+            '_id': {'$dateTrunc': {'date': f'${date_field}', 'unit': 'day'}},
+            'count': {'$sum': 1},
+        }},
+    ])
+    return {group['_id'].date(): group['count'] for group in groups}
+
+
+def daily_trends(days, series=tuple(TREND_SERIES), today=None):
+    """
+    One row per day of the last `days` days (oldest first, today last) with a
+    count for each of `series`, read with one aggregation per series.
+    """
+    today = today or datetime.utcnow().date()
+    first_day = today - timedelta(days=days - 1)
+    start = datetime.combine(first_day, time.min)
+    counts = {name: daily_counts(*TREND_SERIES[name], start) for name in series}
+
+    trends = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        row = {'date': day.strftime('%Y-%m-%d')}
+        row.update({name: counts[name].get(day, 0) for name in series})
+        trends.append(row)
+    return trends
+
+
+def _leaderboard(profile_field, profile_collection, count_name, limit):
+    """
+    Top `limit` profiles by number of donations referencing them through
+    `profile_field`, grouped and ranked in the database; only the winners are
+    joined to their profile and user.
+    """
+    rows = MongoDonation.objects.aggregate([
+        {'$match': {profile_field: {'$ne': None}}},
+        {'$group': {'_id': f'${profile_field}', 'count': {'$sum': 1}}},
+        {'$sort': {'count': -1, '_id': 1}},
+        {'$limit': limit},
+        {'$lookup': {'from': profile_collection, 'localField': '_id', 'foreignField': '_id', 'as': 'profile'}},
+        {'$unwind': '$profile'},
+        {'$lookup': {'from': 'users', 'localField': 'profile.user_id', 'foreignField': '_id', 'as': 'user'}},
+        {'$unwind': '$user'},
+        {'$project': {'count': 1, 'user._id': 1, 'user.name': 1, 'user.email': 1}},
+    ])
+    return [{'user': Row(row['user']), count_name: row['count']} for row in rows]
+
+
+def top_donors(limit=LEADERBOARD_SIZE):
+    """[{'user', 'donation_count'}] of the donors with the most donations, cached briefly"""
+    return cached(STATS_NAMESPACE, f'top_donors:{limit}',
+                  lambda: _leaderboard('donor_id', 'donors', 'donation_count', limit), LEADERBOARD_TTL)
+
+
+def top_recipients(limit=LEADERBOARD_SIZE):
+    """[{'user', 'claimed_count'}] of the recipients with the most claimed donations, cached briefly"""
+    return cached(STATS_NAMESPACE, f'top_recipients:{limit}',
+                  lambda: _leaderboard('recipient_id', 'recipients', 'claimed_count', limit), LEADERBOARD_TTL)
+
+
+def _category_status_matrix():
+    groups = MongoDonation.objects.aggregate([
+        *lookup_one('items', 'item_id', 'item', ('category',)),
+        # Donations whose item was deleted have no category
+        {'$match': {'item': {'$exists': True}}},
+        {'$group': {'_id': {'category': '$item.category', 'status': '$status'}, 'count': {'$sum': 1}}},
+    ])
+
+    matrix = {}
+    for group in groups:
+        category = group['_id'].get('category')
+        row = matrix.setdefault(category, dict(
+            {'item__category': category, 'total_count': 0},
+            **{f'{status}_count': 0 for status in CATEGORY_STATUSES}
+        ))
+        row['total_count'] += group['count']
+        if group['_id'].get('status') in CATEGORY_STATUSES:
+            row[f"{group['_id']['status']}_count"] += group['count']
+    return [matrix[category] for category in sorted(matrix, key=lambda category: category or '')]
+
+
+def category_status_stats():
+    """
+    [{'item__category', 'total_count', '<status>_count'...}] of donations per
+    item category and status, from one $lookup + $group aggregation, cached briefly
+    """
+    return cached(STATS_NAMESPACE, 'category_status', _category_status_matrix, CATEGORY_STATS_TTL)
+
+
+def donation_category_facets():
+    """[Facet] of item categories with their number of donations in any status, for admin filters"""
+    return facets_from_groups(
+        [{'_id': row['item__category'], 'count': row['total_count']} for row in category_status_stats()],
+        ITEM_CATEGORIES,
+    )
@@ -0,0 +1,139 @@
+"""
+Hot/cold split for activities
+Activities whose date has passed are moved, in batches, from `activities` and
+`volunteer_activities` into archive collections with the same document shape,
+so the live collections (and their indexes) only hold upcoming activities.
+History readers (admin pages) look in both places.
+"""
+
+from datetime import datetime, timedelta
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+
+from mongo_facets import invalidate_activities
+from mongo_models import Activity as MongoActivity, VolunteerActivity as MongoVolunteerActivity
+from mongo_projection import Row
+
+ACTIVITY_ARCHIVE = 'activities_archive'
+PARTICIPATION_ARCHIVE = 'volunteer_activities_archive'
+ARCHIVE_BATCH_SIZE = 500
+# Activities are kept live for this long after their date
+ARCHIVE_AFTER_DAYS = 1
+
+DUPLICATE_KEY = 11000
+
+
+def archive_collections():
+    """(activities archive, participations archive) pymongo collections"""
+    db = MongoActivity._get_db()
+    return db[ACTIVITY_ARCHIVE], db[PARTICIPATION_ARCHIVE]
+
+
+def ensure_archive_indexes():
+    """Indexes used by the history readers; creating existing indexes is a no-op"""
+    activities, participations = archive_collections()
+    activities.create_index([('created_at', DESCENDING), ('_id', DESCENDING)])
+    activities.create_index([('volunteer_id', ASCENDING)])
+    activities.create_index([('archive_pending', ASCENDING)], sparse=True)
+    participations.create_index([('activity_id', ASCENDING), ('volunteer_id', ASCENDING)], unique=True)
+    participations.create_index([('volunteer_id', ASCENDING)])
+
+
+def _copy(collection, docs):
+    """Insert `docs`, skipping ones already copied by an interrupted run"""
+    if not docs:
+        return
+    try:
+        collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        if any(error.get('code') != DUPLICATE_KEY for error in e.details.get('writeErrors', [])):
+            raise
+
+
+def _move_participations(activity_ids):
+    """Move the participations of already archived activities; returns how many were moved"""
+    activities_archive, participations_archive = archive_collections()
+    live = MongoVolunteerActivity._get_collection()
+    docs = list(live.find({'activity_id': {'$in': activity_ids}}))
+    _copy(participations_archive, docs)
+    live.delete_many({'_id': {'$in': [doc['_id'] for doc in docs]}})
+    activities_archive.update_many({'_id': {'$in': activity_ids}}, {'$unset': {'archive_pending': ''}})
+    return len(docs)
+
+
+def archive_expired_activities(before=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move activities dated before `before` (default: ARCHIVE_AFTER_DAYS ago) and
+    their participations to the archive. Returns (activities, participations) moved.
+
+    Each batch is copied, then removed from `activities` -- after which joins
+    find no activity and cannot add participations -- and only then are its
+    participations moved. Archived activities carry `archive_pending` until
+    that last step, so a run that was interrupted is finished by the next one.
+    """
+    if before is None:
+        before = datetime.utcnow() - timedelta(days=ARCHIVE_AFTER_DAYS)
+    activities_archive, _ = archive_collections()
+    live = MongoActivity._get_collection()
+    moved_activities = moved_participations = 0
+
+    pending = [doc['_id'] for doc in activities_archive.find({'archive_pending': True}, {'_id': 1})]
+    for start in range(0, len(pending), batch_size):
+        moved_participations += _move_participations(pending[start:start + batch_size])
+
+    while True:
+        docs = list(live.find({'activity_date': {'$lt': before}}).sort('_id', ASCENDING).limit(batch_size))
+        if not docs:
+            break
+        ids = [doc['_id'] for doc in docs]
+        archived_at = datetime.utcnow()
+        _copy(activities_archive, [dict(doc, archived_at=archived_at, archive_pending=True) for doc in docs])
+        live.delete_many({'_id': {'$in': ids}})
+        moved_activities += len(ids)
+        moved_participations += _move_participations(ids)
+
+    if moved_activities:
+        invalidate_activities()
+    return moved_activities, moved_participations
+
+
+def archived_activities(query, fields=None):
+    """Rows of archived activities matching `query`, newest first"""
+    activities_archive, _ = archive_collections()
+    projection = dict.fromkeys(fields, 1) if fields else None
+    return [Row(doc) for doc in activities_archive.find(query, projection).sort('created_at', DESCENDING)]
+
+
+def archived_activity_count(query=None):
+    """Number of archived activities matching `query`"""
+    activities_archive, _ = archive_collections()
+    return activities_archive.count_documents(query or {})
+
+
+def archived_participation_counts(query=None):
+    """{status: count} of archived participations matching `query`"""
+    _, participations_archive = archive_collections()
+    groups = participations_archive.aggregate([
+        {'$match': query or {}},
+        {'$group': {'_id': '$status', 'count': {'$sum': 1}}},
+    ])
+    return {group['_id']: group['count'] for group in groups}
+
+
+def delete_archived_activity(activity_id):
+    """Remove an archived activity and its participations; returns whether it existed"""
+    activities_archive, participations_archive = archive_collections()
+    if not activities_archive.delete_one({'_id': activity_id}).deleted_count:
+        return False
+    participations_archive.delete_many({'activity_id': activity_id})
+    return True
+
+
+def delete_archived_activities(volunteer_id):
+    """Remove every archived activity organized by `volunteer_id`, with their participations"""
+    activities_archive, participations_archive = archive_collections()
+    ids = activities_archive.distinct('_id', {'volunteer_id': volunteer_id})
+    if ids:
+        participations_archive.delete_many({'activity_id': {'$in': ids}})
+        activities_archive.delete_many({'_id': {'$in': ids}})
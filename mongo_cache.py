@@ -0,0 +1,58 @@
+"""
+Versioned caching for values derived from MongoDB
+Cached values live in Django's cache (in-process LocMemCache unless CACHES
+says otherwise) under a key that embeds a namespace version. Write paths call
+bump_version() and every value cached for the old version stops being read.
+"""
+
+from django.core.cache import cache
+
+_MISSING = object()
+
+
+def _version_key(namespace):
+    return f'mongo:{namespace}:version'
+
+
+def get_version(namespace):
+    """Current version of `namespace`, starting at 1"""
+    return cache.get_or_set(_version_key(namespace), 1, None)
+
+
+def bump_version(namespace):
+    """Invalidate everything cached under `namespace`"""
+    key = _version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def cached(namespace, key, compute, ttl):
+    """
+    Return the cached value for `key` in the current version of `namespace`,
+    computing and storing it for `ttl` seconds on a miss.
+    """
+    full_key = f'mongo:{namespace}:v{get_version(namespace)}:{key}'
+    value = cache.get(full_key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        cache.set(full_key, value, ttl)
+    return value
+
+
+def cached_many(namespace, keys, compute, ttl):
+    """
+    Batch form of cached(): return {key: value} for every key in `keys`.
+    `compute(missing)` is called once with the keys that missed and must
+    return {key: value} for them.
+    """
+    prefix = f'mongo:{namespace}:v{get_version(namespace)}:'
+    found = cache.get_many([prefix + key for key in keys])
+    values = {key: found[prefix + key] for key in keys if prefix + key in found}
+    missing = [key for key in keys if key not in values]
+    if missing:
+        computed = compute(missing)
+        cache.set_many({prefix + key: value for key, value in computed.items()}, ttl)
+        values.update(computed)
+    return values
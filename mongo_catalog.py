@@ -0,0 +1,78 @@
+"""
+Catalog queries for the donation list pages
+Pages are served from the denormalized `listings` collection with one indexed
+range query per page, so a page view costs one round trip regardless of catalog size
+"""
+
+from types import SimpleNamespace
+
+from mongo_models import Listing
+from mongo_listings import LISTING_ITEM_FIELDS
+from mongo_pagination import keyset_page
+from mongo_search import search_queryset, use_text_search, regex_match
+from mongo_geo import nearby_page
+from mongo_projection import CATALOG_FIELDS
+
+CATALOG_PAGE_SIZE = 12
+SEARCH_FIELDS = ('name', 'description')
+
+
+class CatalogEntry:
+    """Listing shaped like a donation with its item, as used by donations/donation_list.html"""
+
+    distance_km = None
+
+    def __init__(self, listing):
+        self.id = listing.id
+        self.status = 'available'
+        self.created_at = listing.created_at
+        self.donor_id = listing.donor_id
+        self.recipient_id = None
+        self.item = SimpleNamespace(
+            id=listing.item_id,
+            created_at=listing.created_at,
+            **{field: getattr(listing, field) for field in LISTING_ITEM_FIELDS}
+        )
+        donor_name = listing.donor_name
+        self.donor = SimpleNamespace(user=SimpleNamespace(name=donor_name)) if donor_name else None
+
+
+def _filters(category, condition):
+    query = {}
+    if category:
+        query['category'] = category
+    if condition:
+        query['condition'] = condition
+    return query
+
+
+def catalog_queryset(category='', condition='', search=''):
+    """Listings matching the catalog filters, ranked by relevance when searching"""
+    return search_queryset(Listing.objects(**_filters(category, condition)), search, SEARCH_FIELDS, '-created_at')
+
+
+def available_donations_page(category='', condition='', search='', params=None, per_page=CATALOG_PAGE_SIZE,
+                             near=None, radius_km=None):
+    """
+    Return a page of available donations read from the `listings` collection.
+    `params` is the request's query string; its cursor selects the page.
+    With a `near` point only listings within `radius_km` are returned, nearest
+    first; the text index cannot be combined with `$geoNear`, so searching
+    within a radius matches by substring instead.
+    """
+    params = params or {}
+    if near:
+        query = _filters(category, condition)
+        if (search or '').strip():
+            query.update(regex_match(search, SEARCH_FIELDS))
+        return nearby_page(Listing, near, radius_km, query, params, per_page, wrap=CatalogEntry,
+                           fields=CATALOG_FIELDS)
+
+    return keyset_page(
+        catalog_queryset(category, condition, search),
+        params,
+        per_page,
+        ranked=use_text_search(search),
+        wrap=CatalogEntry,
+        fields=CATALOG_FIELDS,
+    )
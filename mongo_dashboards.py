@@ -0,0 +1,204 @@
+"""
+Data providers for the donor, recipient and volunteer dashboards
+Each provider returns the template context of one dashboard section, read
+with as few aggregations as the section allows. Sections are cached per user
+under a version that the write paths touching that user bump.
+"""
+
+import hashlib
+
+from mongo_models import Donation as MongoDonation, Activity as MongoActivity, \
+    VolunteerActivity as MongoVolunteerActivity
+from mongo_pagination import CURSOR_PARAM, decode_cursor, keyset_match, keyset_sort, build_page, keyset_aggregate
+from mongo_projection import Row, load_rows, DONOR_DASHBOARD_ITEM_FIELDS, RECIPIENT_DASHBOARD_ITEM_FIELDS, \
+    VOLUNTEER_DASHBOARD_ACTIVITY_FIELDS, JOINED_ACTIVITY_FIELDS
+from mongo_admin_queries import lookup_one
+from mongo_catalog import available_donations_page
+from mongo_facets import donation_facets
+from mongo_cache import bump_version, cached, get_version
+from mongo_archive import ACTIVITY_ARCHIVE, PARTICIPATION_ARCHIVE
+
+DASHBOARD_NAMESPACE = 'dashboard'
+DASHBOARD_TTL = 300
+DASHBOARD_PAGE_SIZE = 10
+# Available donations shown on the recipient dashboard before "load more"
+AVAILABLE_PREVIEW_SIZE = 6
+
+
+def _user_namespace(user_id):
+    return f'{DASHBOARD_NAMESPACE}:{user_id}'
+
+
+def cached_section(user_id, section, compute, params=None, depends_on=()):
+    """
+    `compute()` cached for the user's current dashboard version and the page
+    cursor in `params`. Sections that also show shared data list the
+    namespaces it comes from in `depends_on`, whose versions join the key.
+    """
+    cursor = (params or {}).get(CURSOR_PARAM) or ''
+    page = hashlib.md5(cursor.encode()).hexdigest() if cursor else 'first'
+    versions = ''.join(f':{namespace}{get_version(namespace)}' for namespace in depends_on)
+    return cached(_user_namespace(user_id), f'{section}{versions}:{page}', compute, DASHBOARD_TTL)
+
+
+def invalidate_dashboards(*user_ids):
+    """Called by write paths with the users whose dashboards they change"""
+    for user_id in {str(user_id) for user_id in user_ids if user_id is not None}:
+        bump_version(_user_namespace(user_id))
+
+
+def invalidate_profile_dashboards(document, *profile_ids):
+    """invalidate_dashboards() for the owners of donor/recipient/volunteer profiles"""
+    profile_ids = [profile_id for profile_id in profile_ids if profile_id is not None]
+    if profile_ids:
+        invalidate_dashboards(*document.objects(id__in=profile_ids).distinct('user_id'))
+
+
+def _status_counts(groups):
+    return {group['_id']: group['count'] for group in groups}
+
+
+def _donation_with_item(doc):
+    item = doc.pop('item', None)
+    row = Row(doc)
+    row.item = Row(item) if item else None
+    return row
+
+
+def donor_dashboard(donor_id, params, per_page=DASHBOARD_PAGE_SIZE):
+    """
+    One page of the donor's donations joined with their items, plus the
+    per-status counts, from a single $facet aggregation over the donor's
+    donations (matched on the (donor_id, status) index).
+    """
+    cursor = decode_cursor(params.get(CURSOR_PARAM)) or {}
+    cursor = {} if 'o' in cursor else cursor
+
+    result = next(iter(MongoDonation.objects(donor_id=donor_id).aggregate([
+        {'$facet': {
+            'page': [
+                {'$match': keyset_match('created_at', cursor)},
+                {'$sort': keyset_sort('created_at', cursor)},
+                {'$limit': per_page + 1},
+                *lookup_one('items', 'item_id', 'item', DONOR_DASHBOARD_ITEM_FIELDS),
+            ],
+            'statuses': [{'$group': {'_id': '$status', 'count': {'$sum': 1}}}],
+        }},
+    ])), {})
+
+    page = build_page(result.get('page', []), cursor, per_page, 'created_at', params=params,
+                      key=lambda doc: (doc['created_at'], doc['_id']), wrap=_donation_with_item)
+    # Donations whose item was deleted are not shown
+    page.object_list = [donation for donation in page if donation.item]
+
+    counts = _status_counts(result.get('statuses', []))
+    return {
+        'donations': page,
+        'items': [donation.item for donation in page],
+        'total_donations': sum(counts.values()),
+        'available_donations': counts.get('available', 0),
+        'claimed_donations': counts.get('claimed', 0),
+        'people_helped': counts.get('claimed', 0) + counts.get('shipped', 0),
+    }
+
+
+def recipient_claimed_page(recipient_id, params, per_page=DASHBOARD_PAGE_SIZE):
+    """One keyset page of the recipient's claimed donations, on the (recipient_id, created_at) index"""
+    return keyset_aggregate(
+        MongoDonation, {'recipient_id': recipient_id}, params, per_page,
+        join_stages=lookup_one('items', 'item_id', 'item', RECIPIENT_DASHBOARD_ITEM_FIELDS),
+        wrap=_donation_with_item,
+    )
+
+
+def available_preview_page(params=None, per_page=AVAILABLE_PREVIEW_SIZE):
+    """A page of available donations from the catalog read model; later pages are fetched as JSON"""
+    return available_donations_page(params=params, per_page=per_page)
+
+
+def catalog_entry_json(entry):
+    """JSON-safe dict of one available donation for the dashboard's "load more" requests"""
+    item = entry.item
+    return {
+        'id': str(entry.id),
+        'name': item.name,
+        'category': item.category,
+        'condition': item.condition,
+        'image_url': item.image_url,
+        'latitude': item.latitude,
+        'longitude': item.longitude,
+        'donor_name': entry.donor.user.name if entry.donor else None,
+        'created_at': entry.created_at.isoformat() if entry.created_at else None,
+    }
+
+
+def recipient_dashboard(recipient_id, params, per_page=DASHBOARD_PAGE_SIZE):
+    """
+    The recipient's claimed history (paged by the request's cursor), the first
+    few available donations and the two counts. The available count is the
+    sum of the cached catalog facets, so no query grows with the catalog.
+    """
+    return {
+        'claimed_donations': recipient_claimed_page(recipient_id, params, per_page),
+        'donations': available_preview_page(),
+        'total_claimed': MongoDonation.objects(recipient_id=recipient_id).count(),
+        'available_items': sum(facet.count for facet in donation_facets()['categories']),
+    }
+
+
+def _participation_with_activity(doc):
+    activity = doc.pop('activity', None)
+    row = Row(doc)
+    row.activity = Row(activity) if activity else None
+    return row
+
+
+def volunteer_dashboard(volunteer_id):
+    """
+    The activities the volunteer organizes (one projected query) and the ones
+    they joined, embedded in their participations, with the per-status
+    participation counts (one $facet aggregation with a $lookup). The same
+    aggregation pulls in the volunteer's archived participations and archived
+    activities with $unionWith, so the counts are all-time.
+    """
+    activities = load_rows(MongoActivity.objects(volunteer_id=volunteer_id), VOLUNTEER_DASHBOARD_ACTIVITY_FIELDS)
+
+    live = {'archived': {'$exists': False}}
+    result = next(iter(MongoVolunteerActivity.objects(volunteer_id=volunteer_id).aggregate([
+        {'$unionWith': {'coll': PARTICIPATION_ARCHIVE, 'pipeline': [
+            {'$match': {'volunteer_id': volunteer_id}},
+            {'$project': {'status': 1, 'archived': 'participation'}},
+        ]}},
+        {'$unionWith': {'coll': ACTIVITY_ARCHIVE, 'pipeline': [
+            {'$match': {'volunteer_id': volunteer_id}},
+            {'$project': {'archived': 'activity'}},
+        ]}},
+        {'$facet': {
+            'joined': [
+                {'$match': dict(live, status='joined')},
+                {'$sort': {'created_at': -1}},
+                *lookup_one('activities', 'activity_id', 'activity', JOINED_ACTIVITY_FIELDS),
+            ],
+            'statuses': [
+                {'$match': {'archived': {'$ne': 'activity'}}},
+                {'$group': {'_id': '$status', 'count': {'$sum': 1}}},
+            ],
+            'archived_activities': [
+                {'$match': {'archived': 'activity'}},
+                {'$count': 'count'},
+            ],
+        }},
+    ])), {})
+
+    joined = [_participation_with_activity(doc) for doc in result.get('joined', [])]
+    counts = _status_counts(result.get('statuses', []))
+    archived_activities = next(iter(result.get('archived_activities', [])), {}).get('count', 0)
+    return {
+        'activities': activities,
+        # Participations whose activity was deleted are not shown
+        'joined_activities': [participation for participation in joined if participation.activity],
+        'total_activities': len(activities) + archived_activities,
+        'available_activities': sum(1 for activity in activities if (activity.status or 'available') == 'available'),
+        'joined_count': counts.get('joined', 0),
+        'completed_count': counts.get('completed', 0),
+    }
@@ -0,0 +1,70 @@
+"""
+Filter facets for the catalog and activity pages
+Each category/condition comes with a live count, computed in one aggregation
+and cached until the underlying collection is written or the TTL expires
+"""
+
+from collections import namedtuple
+from datetime import datetime
+
+from mongo_cache import bump_version, cached
+from mongo_models import Activity as MongoActivity, Listing
+
+CATALOG_NAMESPACE = 'catalog'
+ACTIVITIES_NAMESPACE = 'activities'
+FACET_TTL = 300
+
+# Vocabularies offered by the donation and activity forms; listed as filters even without matches
+ITEM_CATEGORIES = ('Clothing', 'Books', 'Electronics', 'Furniture', 'Toys', 'Other')
+ITEM_CONDITIONS = ('New', 'Like New', 'Good', 'Fair')
+ACTIVITY_CATEGORIES = ('Education', 'Healthcare', 'Community', 'Environment', 'Sports', 'Other')
+
+Facet = namedtuple('Facet', ['name', 'count'], defaults=(None,))
+
+
+def facets_from_groups(groups, names=()):
+    """Merge aggregation groups with known names that currently have no matches"""
+    counts = {group['_id']: group['count'] for group in groups if group['_id']}
+    for name in names:
+        counts.setdefault(name, 0)
+    return [Facet(name, counts[name]) for name in sorted(counts)]
+
+
+def _compute_donation_facets():
+    result = next(iter(Listing.objects.aggregate([
+        {'$facet': {
+            'categories': [{'$group': {'_id': '$category', 'count': {'$sum': 1}}}],
+            'conditions': [{'$group': {'_id': '$condition', 'count': {'$sum': 1}}}],
+        }},
+    ])), {})
+    return {
+        'categories': facets_from_groups(result.get('categories', []), ITEM_CATEGORIES),
+        'conditions': facets_from_groups(result.get('conditions', []), ITEM_CONDITIONS),
+    }
+
+
+def donation_facets():
+    """{'categories': [Facet], 'conditions': [Facet]} with counts of available donations"""
+    return cached(CATALOG_NAMESPACE, 'facets', _compute_donation_facets, FACET_TTL)
+
+
+def _compute_activity_facets():
+    groups = MongoActivity.objects(activity_date__gte=datetime.utcnow()).aggregate([
+        {'$group': {'_id': '$category', 'count': {'$sum': 1}}},
+    ])
+    return facets_from_groups(groups, ACTIVITY_CATEGORIES)
+
+
+def activity_facets():
+    """[Facet] of activity categories with counts of upcoming activities"""
+    return cached(ACTIVITIES_NAMESPACE, 'facets', _compute_activity_facets, FACET_TTL)
+
+
+def invalidate_catalog():
+    """Called whenever items or donations are written"""
+    bump_version(CATALOG_NAMESPACE)
+
+
+def invalidate_activities():
+    """Called whenever activities are created or deleted"""
+    bump_version(ACTIVITIES_NAMESPACE)
@@ -0,0 +1,99 @@
+"""
+Geospatial "near me" browsing
+Coordinates are stored as GeoJSON points next to the legacy latitude/longitude
+floats, so `$geoNear` can answer distance queries from the 2dsphere indexes
+declared in mongo_models instead of scanning and measuring every document
+"""
+
+from mongo_pagination import ranked_aggregate
+from mongo_projection import Row
+
+NEAR_PARAM = 'near'
+RADIUS_PARAM = 'radius_km'
+DEFAULT_RADIUS_KM = 25
+MAX_RADIUS_KM = 500
+RADIUS_CHOICES = (5, 10, 25, 50, 100)
+
+
+def geo_point(latitude, longitude):
+    """GeoJSON point for a coordinate pair, or None when either is missing or out of range"""
+    if latitude is None or longitude is None:
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return {'type': 'Point', 'coordinates': [float(longitude), float(latitude)]}
+
+
+def user_point(user):
+    """The point of a user's saved address, if it has coordinates"""
+    address = getattr(user, 'address', None)
+    if not address:
+        return None
+    return address.point or geo_point(address.latitude, address.longitude)
+
+
+def near_filter(params, user=None):
+    """
+    Read the distance filter from the query string.
+    `near=<lat>,<lng>` searches around that point; `near=me` or a bare
+    `radius_km` searches around the logged-in user's address.
+    Returns (point, radius_km), or (None, None) when not browsing by distance.
+    """
+    near = (params.get(NEAR_PARAM) or '').strip()
+    radius = (params.get(RADIUS_PARAM) or '').strip()
+    if not near and not radius:
+        return None, None
+
+    if near and near != 'me':
+        try:
+            latitude, longitude = (float(value) for value in near.split(','))
+        except ValueError:
+            return None, None
+        point = geo_point(latitude, longitude)
+    else:
+        point = user_point(user) if user else None
+    if point is None:
+        return None, None
+
+    try:
+        radius_km = float(radius) if radius else DEFAULT_RADIUS_KM
+    except ValueError:
+        radius_km = DEFAULT_RADIUS_KM
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        radius_km = DEFAULT_RADIUS_KM
+    return point, radius_km
+
+
+def geo_near_stage(point, radius_km, query=None):
+    """
+    `$geoNear` stage returning documents within `radius_km`, nearest first.
+    It must be the first stage of the pipeline and `query` may not use `$text`.
+    """
+    return {'$geoNear': {
+        'near': point,
+        'key': 'point',
+        'distanceField': 'distance',
+        'maxDistance': radius_km * 1000,
+        'spherical': True,
+        'query': query or {},
+    }}
+
+
+def nearby_page(document, point, radius_km, query, params, per_page, wrap=None, fields=None):
+    """
+    One page of `document`s around `point`, ordered by distance.
+    Each row is loaded as a `document`, or as a `Row` of just `fields`, then
+    passed through `wrap` and given a `distance_km` attribute for the template.
+    """
+    wrap = wrap or (lambda obj: obj)
+    pipeline = [geo_near_stage(point, radius_km, query)]
+    if fields:
+        pipeline.append({'$project': dict({field: 1 for field in fields}, distance=1)})
+
+    def load(row):
+        distance = row.pop('distance', None)
+        obj = wrap(Row(row) if fields else document._from_son(row))
+        obj.distance_km = round(distance / 1000, 1) if distance is not None else None
+        return obj
+
+    return ranked_aggregate(document, pipeline, params, per_page, wrap=load)
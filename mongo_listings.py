@@ -0,0 +1,122 @@
+"""
+Maintenance of the `listings` read model
+Every write path that changes a donation's availability calls into this
+module so the catalog can be served from a single indexed collection
+"""
+
+import logging
+
+from mongo_models import User as MongoUser, Donor as MongoDonor, Item as MongoItem, \
+    Donation as MongoDonation, Listing
+from mongo_facets import invalidate_catalog
+
+logger = logging.getLogger(__name__)
+
+# Fields copied from the item onto its listing
+LISTING_ITEM_FIELDS = (
+    'name', 'description', 'category', 'condition', 'image_url',
+    'latitude', 'longitude', 'point', 'item_location',
+)
+
+
+def _donor_name(donor_id):
+    donor = MongoDonor.objects(id=donor_id).only('user_id').first()
+    if not donor:
+        return None
+    donor_user = MongoUser.objects(id=donor.user_id).only('name').first()
+    return donor_user.name if donor_user else None
+
+
+def sync_listing(donation, item=None, donor_name=None):
+    """
+    Bring the listing for `donation` in line with its current state.
+    Available donations are upserted, anything else is removed from the catalog.
+    """
+    if donation.status != 'available':
+        remove_listing(donation.id)
+        return None
+
+    if item is None:
+        item = MongoItem.objects(id=donation.item_id).first()
+    if item is None:
+        logger.warning(f"Donation {donation.id} has no item, removing its listing")
+        remove_listing(donation.id)
+        return None
+    if donor_name is None:
+        donor_name = _donor_name(donation.donor_id)
+
+    listing = Listing(
+        id=donation.id,
+        item_id=item.id,
+        donor_id=donation.donor_id,
+        donor_name=donor_name,
+        created_at=donation.created_at,
+        **{field: getattr(item, field) for field in LISTING_ITEM_FIELDS}
+    )
+    listing.save()
+    invalidate_catalog()
+    return listing
+
+
+def remove_listing(donation_id):
+    """Drop a donation from the catalog"""
+    Listing.objects(id=donation_id).delete()
+    invalidate_catalog()
+
+
+def remove_donor_listings(donor_id):
+    """Drop every listing that belongs to a donor"""
+    Listing.objects(donor_id=donor_id).delete()
+    invalidate_catalog()
+
+
+def listing_source_pipeline():
+    """Aggregation over `donations` that produces documents in the `listings` shape"""
+    return [
+        {'$match': {'status': 'available'}},
+        {'$lookup': {
+            'from': 'items',
+            'localField': 'item_id',
+            'foreignField': '_id',
+            'as': 'item',
+        }},
+        {'$unwind': '$item'},
+        {'$lookup': {
+            'from': 'donors',
+            'localField': 'donor_id',
+            'foreignField': '_id',
+            'as': 'donor',
+        }},
+        {'$unwind': {'path': '$donor', 'preserveNullAndEmptyArrays': True}},
+        {'$lookup': {
+            'from': 'users',
+            'localField': 'donor.user_id',
+            'foreignField': '_id',
+            'as': 'donor_user',
+            'pipeline': [{'$project': {'name': 1}}],
+        }},
+        {'$unwind': {'path': '$donor_user', 'preserveNullAndEmptyArrays': True}},
+        {'$project': dict(
+            {
+                'item_id': '$item._id',
+                'donor_id': 1,
+                'donor_name': '$donor_user.name',
+                'created_at': 1,
+            },
+            **{field: f'$item.{field}' for field in LISTING_ITEM_FIELDS}
+        )},
+    ]
+
+
+def rebuild_listings():
+    """
+    Recompute the whole `listings` collection from donations and items.
+    `$out` swaps the collection atomically and keeps its indexes, so the
+    catalog keeps serving the old data until the rebuild finishes.
+    """
+    Listing.ensure_indexes()
+    list(MongoDonation.objects.aggregate(
+        listing_source_pipeline() + [{'$out': Listing._get_collection_name()}]
+    ))
+    invalidate_catalog()
+    return Listing.objects.count()
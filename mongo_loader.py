@@ -0,0 +1,59 @@
+"""
+Request-scoped batching loaders for MongoDB documents
+A view hands a loader every id it is about to need; unknown ids are fetched
+with one `$in` query per collection and kept in an identity map on the request,
+so a loop over N rows costs one query per collection instead of N `.first()` calls
+"""
+
+from mongo_projection import Row, projected
+
+
+class Loader:
+    """Identity map of one document class (optionally projected to `fields`) keyed by _id"""
+
+    def __init__(self, document, fields=None):
+        self.document = document
+        self.fields = tuple(fields) if fields else None
+        self._objects = {}
+
+    def _fetch(self, ids):
+        queryset = self.document.objects(id__in=ids)
+        if self.fields:
+            return [Row(doc) for doc in projected(queryset, self.fields)]
+        return list(queryset)
+
+    def load_many(self, ids):
+        """
+        Objects for `ids` in the same order, None for missing documents and
+        None ids. Ids not seen before are fetched together in one query.
+        """
+        ids = list(ids)
+        missing = {oid for oid in ids if oid is not None and oid not in self._objects}
+        if missing:
+            found = {obj.id: obj for obj in self._fetch(list(missing))}
+            for oid in missing:
+                self._objects[oid] = found.get(oid)
+        return [self._objects.get(oid) if oid is not None else None for oid in ids]
+
+    def load(self, oid):
+        """Single object by id, through the same identity map"""
+        return self.load_many([oid])[0]
+
+    def prime(self, objects):
+        """Register objects that were already loaded by the view"""
+        for obj in objects:
+            self._objects[obj.id] = obj
+
+
+def loader(request, document, fields=None):
+    """The request's loader for `document` (and projection `fields`), created on first use"""
+    loaders = request.__dict__.setdefault('_mongo_loaders', {})
+    key = (document, tuple(fields) if fields else None)
+    if key not in loaders:
+        loaders[key] = Loader(document, fields)
+    return loaders[key]
+
+
+def related(objects, attr):
+    """`attr` of each object, None where the object itself is missing"""
+    return [getattr(obj, attr) if obj is not None else None for obj in objects]
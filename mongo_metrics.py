@@ -0,0 +1,132 @@
+"""
+Materialized headline metrics for the admin dashboard
+The user, donation and activity counts are computed by a few $group
+aggregations and stored as one document in `metrics_snapshots`; the dashboard
+reads that document instead of counting on every view. The snapshot is
+refreshed by the `refresh_metrics` command, by the in-process refresher when
+METRICS_REFRESH_SECONDS is set, or on demand from the dashboard. Without any of
+those, a read recomputes a snapshot older than METRICS_MAX_AGE or one that an
+admin write path has marked stale.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+from pymongo.errors import DuplicateKeyError
+
+from mongo_models import User as MongoUser, Donation as MongoDonation, \
+    Activity as MongoActivity, VolunteerActivity as MongoVolunteerActivity
+from mongo_archive import archived_activity_count, archived_participation_counts
+
+logger = logging.getLogger(__name__)
+
+METRICS_COLLECTION = 'metrics_snapshots'
+ADMIN_SNAPSHOT_ID = 'admin'
+DONATION_STATUSES = ('available', 'claimed', 'shipped', 'unavailable')
+PARTICIPATION_STATUSES = ('joined', 'completed', 'cancelled')
+# Seconds after which a read recomputes the snapshot
+METRICS_MAX_AGE = 300
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def metrics_collection():
+    return MongoUser._get_db()[METRICS_COLLECTION]
+
+
+def _counts_by(document, field):
+    groups = document.objects.aggregate([{'$group': {'_id': f'${field}', 'count': {'$sum': 1}}}])
+    return {group['_id']: group['count'] for group in groups}
+
+
+def compute_metrics():
+    """
+    The headline counts, from one aggregation per collection. Activity and
+    participation totals include the archive; `live_activities` does not.
+    """
+    users = _counts_by(MongoUser, 'is_active')
+    donations = _counts_by(MongoDonation, 'status')
+    participations = _counts_by(MongoVolunteerActivity, 'status')
+    for status, count in archived_participation_counts().items():
+        participations[status] = participations.get(status, 0) + count
+    live_activities = MongoActivity.objects.count()
+
+    metrics = {
+        'total_users': sum(users.values()),
+        'active_users': users.get(True, 0),
+        'blocked_users': users.get(False, 0),
+        'total_donations': sum(donations.values()),
+        'live_activities': live_activities,
+        'total_activities': live_activities + archived_activity_count(),
+    }
+    metrics.update({f'{status}_donations': donations.get(status, 0) for status in DONATION_STATUSES})
+    metrics.update({f'{status}_participations': participations.get(status, 0) for status in PARTICIPATION_STATUSES})
+    return metrics
+
+
+def refresh_metrics():
+    """
+    Recompute the snapshot and store it; returns the computed document.
+    The write only lands if no invalidate_metrics() bumped the snapshot's
+    version while the counts were computed; otherwise the stored snapshot
+    stays stale and the next read computes it again.
+    """
+    collection = metrics_collection()
+    current = collection.find_one({'_id': ADMIN_SNAPSHOT_ID}, {'version': 1}) or {}
+    version = current.get('version')
+    snapshot = dict(compute_metrics(), _id=ADMIN_SNAPSHOT_ID, computed_at=datetime.utcnow(), version=version or 0)
+    try:
+        # {'version': None} also matches a snapshot written before versions existed
+        collection.replace_one({'_id': ADMIN_SNAPSHOT_ID, 'version': version}, snapshot, upsert=True)
+    except DuplicateKeyError:
+        # The version moved meanwhile, so the upsert tried to insert a second snapshot
+        logger.info("Metrics snapshot invalidated during refresh, leaving it stale")
+    return snapshot
+
+
+def metrics_snapshot(max_age=METRICS_MAX_AGE):
+    """The stored snapshot, recomputed on the spot if there is none yet, it is stale or older than `max_age`"""
+    snapshot = metrics_collection().find_one({'_id': ADMIN_SNAPSHOT_ID})
+    if not snapshot or snapshot.get('stale') or snapshot_age(snapshot) > max_age:
+        return refresh_metrics()
+    return snapshot
+
+
+def invalidate_metrics():
+    """Called by write paths that change the counts; the next read recomputes them"""
+    metrics_collection().update_one({'_id': ADMIN_SNAPSHOT_ID}, {'$set': {'stale': True}, '$inc': {'version': 1}})
+
+
+def snapshot_age(snapshot, now=None):
+    """Seconds since `snapshot` was computed"""
+    return max(0, int(((now or datetime.utcnow()) - snapshot['computed_at']).total_seconds()))
+
+
+def _refresh_forever(interval):
+    while True:
+        try:
+            refresh_metrics()
+        except Exception as e:
+            logger.error(f"Metrics refresh failed: {e}")
+        time.sleep(interval)
+
+
+def start_metrics_refresher(interval=None):
+    """
+    Start a daemon thread refreshing the snapshot every `interval` seconds
+    (default: METRICS_REFRESH_SECONDS; 0 or unset leaves refreshing to the
+    command and to reads of an old snapshot). Only one refresher runs per process.
+    """
+    global _refresher
+    interval = interval if interval is not None else getattr(settings, 'METRICS_REFRESH_SECONDS', 0)
+    if not interval:
+        return False
+    with _refresher_lock:
+        if _refresher is None or not _refresher.is_alive():
+            _refresher = threading.Thread(target=_refresh_forever, args=(interval,), name='metrics-refresher', daemon=True)
+            _refresher.start()
+    return True
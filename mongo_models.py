@@ -3,6 +3,9 @@ from datetime import datetime
 import uuid
 from mongoengine import BooleanField, StringField, DateTimeField
 
+# Indexes declared in `meta` are built by `manage.py sync_mongo_indexes` at
+# deploy time, not on first use of a collection inside a request
+
 
 class Address(EmbeddedDocument):
     street = fields.StringField(max_length=255, required=True)
@@ -13,6 +16,7 @@ class Address(EmbeddedDocument):
     instructions = fields.StringField()
     latitude = fields.FloatField()
     longitude = fields.FloatField()
+    point = fields.PointField(auto_index=False)  # GeoJSON copy of latitude/longitude
 
 class User(Document):
     email = fields.EmailField(unique=True, required=True)
@@ -28,7 +32,20 @@ class User(Document):
     
     meta = {
         'collection': 'users',
-        'indexes': ['email', 'name']
+        'auto_create_index': False,
+        'indexes': [
+            'email',
+            'name',
+            # Admin user list: status filter, newest first, keyset on _id
+            ('is_active', '-date_joined', '-id'),
+            ('-date_joined', '-id'),
+            '(address.point',
+            {
+                'fields': ['$name', '$email'],
+                'weights': {'name': 10, 'email': 5},
+                'default_language': 'none',
+            },
+        ]
     }
 
     email_verified = BooleanField(default=False)
@@ -58,6 +75,7 @@ class Donor(Document):
     
     meta = {
         'collection': 'donors',
+        'auto_create_index': False,
         'indexes': ['user_id']
     }
 
@@ -68,6 +86,7 @@ class Recipient(Document):
     
     meta = {
         'collection': 'recipients',
+        'auto_create_index': False,
         'indexes': ['user_id']
     }
 
@@ -79,6 +98,7 @@ class Volunteer(Document):
     
     meta = {
         'collection': 'volunteers',
+        'auto_create_index': False,
         'indexes': ['user_id']
     }
 
@@ -91,12 +111,24 @@ class Item(Document):
     donor_id = fields.ObjectIdField(required=True)
     latitude = fields.FloatField()
     longitude = fields.FloatField()
+    point = fields.PointField(auto_index=False)  # GeoJSON copy of latitude/longitude
     item_location = fields.StringField(max_length=255)
     created_at = fields.DateTimeField(default=datetime.utcnow)
     
     meta = {
         'collection': 'items',
-        'indexes': ['donor_id', 'category', 'name']
+        'auto_create_index': False,
+        'indexes': [
+            'donor_id',
+            'category',
+            'name',
+            '(point',
+            {
+                'fields': ['$name', '$description'],
+                'weights': {'name': 10, 'description': 2},
+                'default_language': 'english',
+            },
+        ]
     }
 
 class Donation(Document):
@@ -108,7 +140,17 @@ class Donation(Document):
     
     meta = {
         'collection': 'donations',
-        'indexes': ['item_id', 'donor_id', 'recipient_id', 'status']
+        'auto_create_index': False,
+        'indexes': [
+            'item_id',
+            # Recipient dashboard: claimed history, newest first
+            ('recipient_id', '-created_at', '-id'),
+            # Dashboards count a donor's donations per status
+            ('donor_id', 'status'),
+            # Admin donation table: status filter, newest first, keyset on _id
+            ('status', '-created_at', '-id'),
+            ('-created_at', '-id'),
+        ]
     }
 
 class Activity(Document):
@@ -118,6 +160,7 @@ class Activity(Document):
     location = fields.StringField(max_length=255, required=True)
     latitude = fields.FloatField()
     longitude = fields.FloatField()
+    point = fields.PointField(auto_index=False)  # GeoJSON copy of latitude/longitude
     image_url = fields.StringField()
     volunteer_id = fields.ObjectIdField(required=True)
     created_at = fields.DateTimeField(default=datetime.utcnow)
@@ -127,10 +170,25 @@ class Activity(Document):
     requirements = fields.StringField()
     contact_info = fields.StringField(max_length=255)
     status = fields.StringField(max_length=20, default='available')
+    joined_count = fields.IntField(default=0)  # VolunteerActivity rows with status 'joined', kept with $inc
     
     meta = {
         'collection': 'activities',
-        'indexes': ['volunteer_id', 'category', 'activity_date']
+        'auto_create_index': False,
+        'indexes': [
+            'volunteer_id',
+            # Activity lists: category filter, newest first, keyset on _id
+            ('category', '-created_at', '-id'),
+            ('-created_at', '-id'),
+            # Upcoming activities grouped by category (facets)
+            ('activity_date', 'category'),
+            '(point',
+            {
+                'fields': ['$title', '$description'],
+                'weights': {'title': 10, 'description': 2},
+                'default_language': 'english',
+            },
+        ]
     }
 
 class VolunteerActivity(Document):
@@ -143,6 +201,50 @@ class VolunteerActivity(Document):
     
     meta = {
         'collection': 'volunteer_activities',
-        'indexes': ['activity_id', 'volunteer_id', 'participant_id', 'status']
+        'auto_create_index': False,
+        'indexes': [
+            'participant_id',
+            'status',
+            # One participation per volunteer and activity; joins rely on it
+            {'fields': ['activity_id', 'volunteer_id'], 'unique': True},
+            # Joined counts per activity and a volunteer's joined activities
+            ('activity_id', 'status'),
+            ('volunteer_id', 'status'),
+        ]
     }
 
+
+class Listing(Document):
+    """Read model for the catalog: one flat document per available donation (_id is the donation id)"""
+    item_id = fields.ObjectIdField(required=True)
+    donor_id = fields.ObjectIdField(required=True)
+    name = fields.StringField(max_length=100)
+    description = fields.StringField()
+    category = fields.StringField(max_length=50)
+    condition = fields.StringField(max_length=50)
+    image_url = fields.StringField()
+    latitude = fields.FloatField()
+    longitude = fields.FloatField()
+    point = fields.PointField(auto_index=False)
+    item_location = fields.StringField(max_length=255)
+    donor_name = fields.StringField(max_length=100)
+    created_at = fields.DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'listings',
+        'auto_create_index': False,
+        'indexes': [
+            'item_id',
+            'donor_id',
+            ('-created_at', '-id'),
+            # Filtered catalog pages: keyset on (created_at, _id) within a category or condition
+            ('category', '-created_at', '-id'),
+            ('condition', '-created_at', '-id'),
+            '(point',
+            {
+                'fields': ['$name', '$description'],
+                'weights': {'name': 10, 'description': 2},
+                'default_language': 'english',
+            },
+        ]
+    }
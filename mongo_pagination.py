@@ -0,0 +1,223 @@
+"""
+Keyset (cursor) pagination for MongoDB list pages
+Pages are addressed by an opaque, signed cursor holding the sort key of the
+row they continue from, so every page costs one indexed range query no matter
+how deep it is, and rows do not shift when new documents are inserted
+"""
+
+from datetime import datetime
+
+from bson import ObjectId
+from django.core import signing
+from django.utils.http import urlencode
+
+from mongo_projection import Row
+
+CURSOR_PARAM = 'cursor'
+CURSOR_SALT = 'mongo-keyset-cursor'
+
+
+def encode_cursor(payload):
+    return signing.dumps(payload, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token):
+    """Return the cursor payload, or None for a missing or tampered cursor"""
+    if not token:
+        return None
+    try:
+        return signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return None
+
+
+def key_cursor(value, oid, direction):
+    """Cursor continuing after (`direction='next'`) or before (`'prev'`) the row with this sort key"""
+    return encode_cursor({'d': direction, 'k': value.isoformat(), 'id': str(oid)})
+
+
+def offset_cursor(offset):
+    """Cursor for relevance-ranked results, which have no stable range key"""
+    return encode_cursor({'o': offset})
+
+
+def keyset_match(sort_field, cursor):
+    """
+    Range filter selecting the rows after/before the cursor's key for a
+    descending (sort_field, _id) order. Returns {} on the first page.
+    """
+    if not cursor or 'k' not in cursor:
+        return {}
+    value = datetime.fromisoformat(cursor['k'])
+    oid = ObjectId(cursor['id'])
+    op = '$gt' if cursor.get('d') == 'prev' else '$lt'
+    return {'$or': [
+        {sort_field: {op: value}},
+        {sort_field: value, '_id': {op: oid}},
+    ]}
+
+
+def keyset_sort(sort_field, cursor):
+    """Sort direction for the range query; previous pages are read backwards"""
+    direction = 1 if cursor and cursor.get('d') == 'prev' else -1
+    return {sort_field: direction, '_id': direction}
+
+
+class KeysetPage:
+    """
+    Page-like result of a cursor query.
+    Iterates like a Django Page and exposes ready-made query strings for the
+    previous/next links, with the current filters preserved.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, params=None, count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+        params = {key: value for key, value in (params or {}).items()
+                  if key not in (CURSOR_PARAM, 'page') and value not in (None, '')}
+        self.next_query = urlencode(dict(params, **{CURSOR_PARAM: next_cursor})) if next_cursor else ''
+        self.previous_query = urlencode(dict(params, **{CURSOR_PARAM: previous_cursor})) if previous_cursor else ''
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)}>'
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def build_page(rows, cursor, per_page, sort_field, params=None, count=None, key=None, wrap=None):
+    """
+    Turn the `per_page + 1` rows fetched for `cursor` into a KeysetPage.
+    `key(row)` returns the row's (sort value, _id); the default reads document attributes.
+    `wrap(row)` converts each row for the template once the cursors are built.
+    """
+    key = key or (lambda row: (getattr(row, sort_field), row.id))
+    wrap = wrap or (lambda row: row)
+    cursor = cursor or {}
+
+    if 'o' in cursor:
+        offset = cursor.get('o', 0)
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        return KeysetPage(
+            [wrap(row) for row in rows],
+            next_cursor=offset_cursor(offset + per_page) if has_more else None,
+            previous_cursor=offset_cursor(max(offset - per_page, 0)) if offset else None,
+            params=params,
+            count=count,
+        )
+
+    backwards = cursor.get('d') == 'prev'
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    next_cursor = previous_cursor = None
+    if rows:
+        if backwards or has_more:
+            next_cursor = key_cursor(*key(rows[-1]), 'next')
+        if (backwards and has_more) or (not backwards and 'k' in cursor):
+            previous_cursor = key_cursor(*key(rows[0]), 'prev')
+    return KeysetPage([wrap(row) for row in rows], next_cursor, previous_cursor, params=params, count=count)
+
+
+def keyset_page(queryset, params, per_page, sort_field='created_at', ranked=False, wrap=None, fields=None):
+    """
+    Fetch one page of a MongoEngine queryset.
+    Unranked querysets are paged on (sort_field, _id) descending; `ranked`
+    querysets (e.g. text search ordered by relevance) keep their own ordering
+    and are paged by offset behind the same opaque cursor.
+    With `fields`, only those fields are loaded and rows are `Row`s instead of documents.
+    """
+    cursor = decode_cursor(params.get(CURSOR_PARAM)) or {}
+    if fields:
+        queryset = queryset.only(*fields, sort_field).as_pymongo()
+
+    if ranked:
+        cursor = {'o': cursor.get('o', 0)}
+        rows = list(queryset.skip(cursor['o']).limit(per_page + 1))
+    else:
+        match = keyset_match(sort_field, cursor)
+        if match:
+            queryset = queryset.filter(__raw__=match)
+        direction = '+' if cursor.get('d') == 'prev' else '-'
+        rows = list(queryset.order_by(f'{direction}{sort_field}', f'{direction}id').limit(per_page + 1))
+
+    if fields:
+        rows = [Row(doc) for doc in rows]
+    return build_page(rows, cursor, per_page, sort_field, params=params, wrap=wrap)
+
+
+def _and(*matches):
+    matches = [match for match in matches if match]
+    if not matches:
+        return {}
+    if len(matches) == 1:
+        return matches[0]
+    return {'$and': matches}
+
+
+def keyset_aggregate(document, match, params, per_page, sort_field='created_at',
+                     filter_stages=(), join_stages=(), wrap=None, union_with=None):
+    """
+    Fetch one page through an aggregation on `document`'s collection.
+    The range match and sort run first so they can use the (sort_field, _id)
+    index; `filter_stages` may drop rows (e.g. after a $lookup) before the
+    limit, and `join_stages` only run for the rows on the page.
+    `union_with` names a collection of the same shape (e.g. an archive) that is
+    paged together with this one: each side contributes at most one page,
+    which are merged and cut down to a page again.
+    """
+    cursor = decode_cursor(params.get(CURSOR_PARAM)) or {}
+    cursor = {} if 'o' in cursor else cursor
+
+    sort = keyset_sort(sort_field, cursor)
+    page = [
+        {'$match': _and(match, keyset_match(sort_field, cursor))},
+        {'$sort': sort},
+        *filter_stages,
+        {'$limit': per_page + 1},
+    ]
+    pipeline = list(page)
+    if union_with:
+        pipeline += [
+            {'$unionWith': {'coll': union_with, 'pipeline': page}},
+            {'$sort': sort},
+            {'$limit': per_page + 1},
+        ]
+    pipeline += join_stages
+    rows = list(document.objects.aggregate(pipeline))
+    return build_page(rows, cursor, per_page, sort_field, params=params,
+                      key=lambda row: (row[sort_field], row['_id']), wrap=wrap)
+
+
+def ranked_aggregate(document, pipeline, params, per_page, wrap=None, join_stages=()):
+    """
+    Fetch one page of an aggregation that ranks its own rows (e.g. `$geoNear`
+    by distance); like ranked querysets it is paged by offset behind the cursor.
+    `join_stages` only run for the rows on the page.
+    """
+    cursor = decode_cursor(params.get(CURSOR_PARAM)) or {}
+    cursor = {'o': cursor.get('o', 0)}
+    rows = list(document.objects.aggregate(
+        list(pipeline) + [{'$skip': cursor['o']}, {'$limit': per_page + 1}] + list(join_stages)
+    ))
+    return build_page(rows, cursor, per_page, None, params=params, wrap=wrap)
@@ -0,0 +1,61 @@
+"""
+Concurrent evaluation of independent dashboard panels
+Each panel is a function run on a thread pool of the view's own, one thread
+per panel, so a page waits for its slowest panel instead of the sum of all of
+them and never queues behind panels of earlier views. Panels that are not done
+by the deadline, or that fail, are replaced by their placeholder value; a slow
+panel that already started keeps running in the background and fills its
+cache for the next view.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+# Seconds a page waits for its panels before rendering placeholders
+PANEL_TIMEOUT = 5
+
+
+def _timed(name, compute):
+    """(value, milliseconds) of `compute()`"""
+    started = time.perf_counter()
+    value = compute()
+    elapsed = (time.perf_counter() - started) * 1000
+    logger.info(f"Panel {name} computed in {elapsed:.1f} ms")
+    return value, elapsed
+
+
+def run_panels(panels, timeout=PANEL_TIMEOUT):
+    """
+    Evaluate `panels` ({name: (compute, placeholder)}) concurrently.
+    Returns (values, timings, unavailable): the value of every panel (its
+    placeholder if it timed out or failed), the milliseconds each finished
+    panel took, and the names of the panels that were replaced.
+    """
+    executor = ThreadPoolExecutor(max_workers=max(len(panels), 1), thread_name_prefix='dashboard-panel')
+    futures = {name: executor.submit(_timed, name, compute) for name, (compute, _) in panels.items()}
+    wait(futures.values(), timeout=timeout)
+    # Drop panels that never started; running ones finish in the background
+    for future in futures.values():
+        future.cancel()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    values, timings, unavailable = {}, {}, set()
+    for name, future in futures.items():
+        if future.cancelled() or not future.done():
+            logger.warning(f"Panel {name} did not finish within {timeout}s, rendering a placeholder")
+        elif future.exception() is not None:
+            logger.error(f"Panel {name} failed: {future.exception()}")
+        else:
+            values[name], timings[name] = future.result()
+            continue
+        values[name] = panels[name][1]
+        unavailable.add(name)
+    return values, timings, unavailable
+
+
+def server_timing(timings):
+    """Server-Timing header value listing each panel's duration"""
+    return ', '.join(f'{name};dur={duration:.1f}' for name, duration in timings.items())
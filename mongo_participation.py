@@ -0,0 +1,118 @@
+"""
+Volunteer participation in activities
+Each activity keeps a `joined_count` that join/leave maintain atomically, so
+pages read it directly and capacity is enforced by the database; the counts
+recomputed from `volunteer_activities` are only needed to reconcile drift
+"""
+
+from mongoengine.errors import NotUniqueError
+from pymongo import ReturnDocument
+
+from mongo_models import Activity as MongoActivity, VolunteerActivity as MongoVolunteerActivity
+
+# Outcomes of join_activity()
+JOINED = 'joined'
+ALREADY_JOINED = 'already_joined'
+FULL = 'full'
+NOT_FOUND = 'not_found'
+
+
+def joined_counts(activity_ids=None):
+    """{activity_id: number of joined volunteers} for `activity_ids` (or every activity), in one aggregation"""
+    match = {'status': 'joined'}
+    if activity_ids is not None:
+        if not activity_ids:
+            return {}
+        match['activity_id'] = {'$in': list(activity_ids)}
+    groups = MongoVolunteerActivity.objects.aggregate([
+        {'$match': match},
+        {'$group': {'_id': '$activity_id', 'count': {'$sum': 1}}},
+    ])
+    return {group['_id']: group['count'] for group in groups}
+
+
+def joined_activity_ids(volunteer_id, activity_ids=None):
+    """Ids of the activities `volunteer_id` has joined, optionally limited to `activity_ids`"""
+    if volunteer_id is None:
+        return set()
+    query = {'volunteer_id': volunteer_id, 'status': 'joined'}
+    if activity_ids is not None:
+        query['activity_id__in'] = list(activity_ids)
+    return set(MongoVolunteerActivity.objects(**query).distinct('activity_id'))
+
+
+def _seat_update(delta):
+    """
+    Pipeline update moving the counter by `delta` and deriving the status from
+    the new count in the same operation: full activities become 'completed',
+    completed ones with a free seat become 'available' again.
+    """
+    return [
+        {'$set': {'joined_count': {'$add': [{'$ifNull': ['$joined_count', 0]}, delta]}}},
+        {'$set': {'status': {'$switch': {
+            'branches': [
+                {'case': {'$gte': ['$joined_count', '$max_participants']}, 'then': 'completed'},
+                {'case': {'$eq': ['$status', 'completed']}, 'then': 'available'},
+            ],
+            'default': '$status',
+        }}}},
+    ]
+
+
+def _move_seat(activity_id, delta, query=None):
+    doc = MongoActivity._get_collection().find_one_and_update(
+        dict(query or {}, _id=activity_id),
+        _seat_update(delta),
+        return_document=ReturnDocument.AFTER,
+    )
+    return MongoActivity._from_son(doc) if doc else None
+
+
+def join_activity(activity_id, volunteer_id, participant_id):
+    """
+    Join `volunteer_id` to an activity without ever exceeding max_participants.
+    A seat is taken first with one conditional findAndModify (which also flips
+    the status), then the participation is recorded; the unique
+    (activity_id, volunteer_id) index turns a duplicate join into a rejoin of a
+    'left' participation or, if already joined, gives the seat back.
+    Returns (JOINED | ALREADY_JOINED | FULL | NOT_FOUND, updated activity or None).
+    """
+    activity = _move_seat(activity_id, 1, {
+        '$expr': {'$lt': [{'$ifNull': ['$joined_count', 0]}, '$max_participants']},
+    })
+    if activity is None:
+        if not MongoActivity.objects(id=activity_id).count():
+            return NOT_FOUND, None
+        if MongoVolunteerActivity.objects(activity_id=activity_id, volunteer_id=volunteer_id, status='joined').count():
+            return ALREADY_JOINED, None
+        return FULL, None
+
+    try:
+        MongoVolunteerActivity(
+            activity_id=activity_id,
+            volunteer_id=volunteer_id,
+            participant_id=participant_id,
+            status='joined',
+        ).save(force_insert=True)
+    except NotUniqueError:
+        rejoined = MongoVolunteerActivity.objects(
+            activity_id=activity_id, volunteer_id=volunteer_id, status='left'
+        ).update_one(set__status='joined')
+        if not rejoined:
+            _move_seat(activity_id, -1)
+            return ALREADY_JOINED, None
+    return JOINED, activity
+
+
+def leave_activity(activity_id, volunteer_id):
+    """
+    Leave an activity: the participation moves from 'joined' to 'left' only
+    once, and only then is the seat released (with the status flip).
+    Returns the updated activity, or None if the volunteer had not joined.
+    """
+    left = MongoVolunteerActivity.objects(
+        activity_id=activity_id, volunteer_id=volunteer_id, status='joined'
+    ).update_one(set__status='left')
+    if not left:
+        return None
+    return _move_seat(activity_id, -1)
@@ -0,0 +1,70 @@
+"""
+Projection-only reads for list and dashboard pages
+Pages fetch just the fields their templates render, as raw dicts, and wrap them
+in `Row` instead of building full MongoEngine documents, which skips field
+validation and the long free-text fields nobody displays
+"""
+
+# Fields rendered by each page; `_id` is always returned
+CATALOG_FIELDS = (
+    'item_id', 'donor_id', 'donor_name', 'created_at', 'name', 'description', 'category',
+    'condition', 'image_url', 'latitude', 'longitude', 'point', 'item_location',
+)
+ACTIVITY_LIST_FIELDS = (
+    'title', 'description', 'category', 'location', 'latitude', 'longitude', 'image_url',
+    'activity_date', 'duration_hours', 'max_participants', 'joined_count', 'status', 'created_at',
+)
+ADMIN_ACTIVITY_FIELDS = (
+    'title', 'description', 'category', 'location', 'activity_date', 'duration_hours',
+    'max_participants', 'image_url', 'volunteer_id', 'created_at',
+)
+ADMIN_USER_FIELDS = ('name', 'email', 'phone', 'is_active', 'date_joined')
+ADMIN_DONATION_ITEM_FIELDS = ('name', 'description', 'category', 'condition', 'image_url')
+DONOR_DASHBOARD_ITEM_FIELDS = ('name', 'category')
+RECIPIENT_DASHBOARD_ITEM_FIELDS = ('name', 'category', 'condition', 'latitude', 'longitude')
+VOLUNTEER_DASHBOARD_ACTIVITY_FIELDS = (
+    'title', 'description', 'category', 'location', 'latitude', 'longitude', 'status',
+    'joined_count', 'max_participants',
+)
+JOINED_ACTIVITY_FIELDS = ('title', 'description', 'category', 'location', 'latitude', 'longitude')
+
+
+class Row:
+    """
+    Attribute access over a raw MongoDB document.
+    `_id` is exposed as `id` and fields that were not projected read as None,
+    like unset document fields. Embedded documents stay plain dicts, which
+    templates resolve the same way. Attributes can still be set on a row for
+    the template (e.g. counts).
+    """
+
+    def __init__(self, doc):
+        self.__dict__.update(doc)
+        if '_id' in doc:
+            self.__dict__['id'] = self.__dict__.pop('_id')
+
+    def __getattr__(self, name):
+        # Only reached for missing attributes; private and dunder lookups
+        # (e.g. Django's __html__ check) must keep raising
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return None
+
+    def __repr__(self):
+        return f'<Row {self.__dict__.get("id")}>'
+
+
+def projected(queryset, fields):
+    """`queryset` restricted to `fields`, returning raw dicts"""
+    return queryset.only(*fields).as_pymongo()
+
+
+def load_rows(queryset, fields):
+    """Rows for every document in `queryset`, loading only `fields`"""
+    return [Row(doc) for doc in projected(queryset, fields)]
+
+
+def load_row(queryset, fields):
+    """Row for the first document in `queryset`, or None"""
+    doc = projected(queryset, fields).first()
+    return Row(doc) if doc else None
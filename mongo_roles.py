@@ -0,0 +1,134 @@
+"""
+Role resolution for MongoDB users
+A user's donor, recipient and volunteer profiles are found with one aggregation
+on `users` instead of three lookups. Results are memoized on the request and
+cached across requests until a profile is created or deleted; role changes are
+rare, so any change simply starts a new cache version for everyone.
+"""
+
+from collections import namedtuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from mongo_cache import bump_version, cached_many
+from mongo_models import User as MongoUser
+
+ROLES_NAMESPACE = 'roles'
+ROLES_TTL = 3600
+
+# Role name -> profile collection
+ROLE_COLLECTIONS = {
+    'donor': 'donors',
+    'recipient': 'recipients',
+    'volunteer': 'volunteers',
+}
+
+Profile = namedtuple('Profile', ['id', 'user_id'])
+
+
+class Roles(namedtuple('Roles', ['user_id', 'donor_id', 'recipient_id', 'volunteer_id'],
+                       defaults=(None, None, None))):
+    """Profile ids held by one user; None for roles the user does not have"""
+    __slots__ = ()
+
+    def _profile(self, profile_id):
+        return Profile(profile_id, self.user_id) if profile_id is not None else None
+
+    @property
+    def donor(self):
+        return self._profile(self.donor_id)
+
+    @property
+    def recipient(self):
+        return self._profile(self.recipient_id)
+
+    @property
+    def volunteer(self):
+        return self._profile(self.volunteer_id)
+
+    @property
+    def is_donor(self):
+        return self.donor_id is not None
+
+    @property
+    def is_recipient(self):
+        return self.recipient_id is not None
+
+    @property
+    def is_volunteer(self):
+        return self.volunteer_id is not None
+
+    @property
+    def role_count(self):
+        return sum([self.is_donor, self.is_recipient, self.is_volunteer])
+
+
+def _object_id(user_id):
+    try:
+        return ObjectId(str(user_id))
+    except (InvalidId, TypeError):
+        return None
+
+
+def role_lookup_stages(roles=tuple(ROLE_COLLECTIONS)):
+    """$lookup of the profile collections of `roles` on users, keeping just the first profile id"""
+    return [
+        {'$lookup': {
+            'from': ROLE_COLLECTIONS[role],
+            'localField': '_id',
+            'foreignField': 'user_id',
+            'as': role,
+            'pipeline': [{'$project': {'_id': 1}}, {'$limit': 1}],
+        }}
+        for role in roles
+    ]
+
+
+def _roles_pipeline():
+    return role_lookup_stages() + [{'$project': {role: 1 for role in ROLE_COLLECTIONS}}]
+
+
+def roles_from_doc(user_id, doc):
+    """Roles of a user document joined by role_lookup_stages()"""
+    ids = {f'{role}_id': doc[role][0]['_id'] if doc.get(role) else None for role in ROLE_COLLECTIONS}
+    return Roles(user_id, **ids)
+
+
+def fetch_roles_many(user_ids):
+    """{str(user_id): Roles} for `user_ids`, read in one aggregation"""
+    oids = [oid for oid in map(_object_id, user_ids) if oid]
+    docs = {}
+    if oids:
+        docs = {str(doc['_id']): doc for doc in MongoUser.objects(id__in=oids).aggregate(_roles_pipeline())}
+    return {str(user_id): roles_from_doc(_object_id(user_id), docs.get(str(user_id), {})) for user_id in user_ids}
+
+
+def _request_memo(request):
+    if request is None:
+        return {}
+    if not hasattr(request, '_mongo_roles'):
+        request._mongo_roles = {}
+    return request._mongo_roles
+
+
+def get_roles(user_id, request=None):
+    """Roles of one user, memoized on `request` when given"""
+    return get_roles_many([user_id], request)[str(user_id)]
+
+
+def get_roles_many(user_ids, request=None):
+    """{str(user_id): Roles} for many users, with one aggregation for all cache misses"""
+    memo = _request_memo(request)
+    keys = [str(user_id) for user_id in user_ids]
+    missing = [key for key in keys if key not in memo]
+    if missing:
+        memo.update(cached_many(ROLES_NAMESPACE, missing, fetch_roles_many, ROLES_TTL))
+    return {key: memo[key] for key in keys}
+
+
+def invalidate_roles(request=None):
+    """Forget cached roles after a profile is created or deleted"""
+    bump_version(ROLES_NAMESPACE)
+    if request is not None:
+        request._mongo_roles = {}
@@ -0,0 +1,55 @@
+"""
+Shared free-text search over the MongoDB collections
+Uses the weighted text indexes declared in mongo_models and ranks results by
+relevance; very short queries fall back to a case-insensitive regex because
+the text index only matches whole (stemmed) words
+"""
+
+import re
+
+from mongoengine.queryset.visitor import Q
+
+# Queries shorter than this are treated as prefixes typed into a search box
+MIN_TEXT_SEARCH_LENGTH = 3
+
+
+def use_text_search(search):
+    """Whether `search` is long enough to go through the text index"""
+    return len((search or '').strip()) >= MIN_TEXT_SEARCH_LENGTH
+
+
+def regex_match(search, fields):
+    """Case-insensitive substring match on any of `fields`"""
+    pattern = re.escape(search.strip())
+    return {'$or': [{field: {'$regex': pattern, '$options': 'i'}} for field in fields]}
+
+
+def search_match(search, fields):
+    """
+    `$match` filter for an aggregation pipeline.
+    Must be the first stage when it contains `$text`.
+    """
+    if not (search or '').strip():
+        return {}
+    if use_text_search(search):
+        return {'$text': {'$search': search.strip()}}
+    return regex_match(search, fields)
+
+
+def search_sort(search, sort):
+    """`$sort` spec that ranks text matches by relevance before `sort`"""
+    if use_text_search(search):
+        return dict({'score': {'$meta': 'textScore'}}, **sort)
+    return sort
+
+
+def search_queryset(queryset, search, fields, *ordering):
+    """
+    Apply `search` to a MongoEngine queryset.
+    Text matches are ordered by relevance first, then by `ordering`.
+    """
+    if not (search or '').strip():
+        return queryset.order_by(*ordering)
+    if use_text_search(search):
+        return queryset.search_text(search.strip()).order_by('$text_score', *ordering)
+    return queryset.filter(Q(__raw__=regex_match(search, fields))).order_by(*ordering)
@@ -4,6 +4,7 @@ This replaces the Django ORM admin with MongoDB operations
 """
 
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.contrib import messages
 from django.http import JsonResponse
 from django.core.paginator import Paginator
@@ -11,7 +12,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.contrib.auth.hashers import check_password, make_password
-from datetime import datetime, timedelta
+from datetime import datetime
 from bson import ObjectId
 import json
 
@@ -19,6 +20,20 @@ from mongo_utils import connect_to_mongodb, get_mongodb_connection
 from mongo_models import User as MongoUser, Donor as MongoDonor, Recipient as MongoRecipient, \
     Volunteer as MongoVolunteer, Item as MongoItem, Donation as MongoDonation, \
     Activity as MongoActivity, VolunteerActivity as MongoVolunteerActivity, Address
+from mongo_listings import sync_listing, remove_listing, remove_donor_listings
+from mongo_search import search_queryset, use_text_search, regex_match
+from mongo_pagination import keyset_page, keyset_aggregate
+from mongo_projection import Row, ADMIN_ACTIVITY_FIELDS
+from mongo_admin_queries import ADMIN_PAGE_SIZE, donation_table_page, user_table_page
+from mongo_facets import activity_facets, invalidate_activities
+from mongo_roles import invalidate_roles
+from mongo_loader import loader, related
+from mongo_dashboards import invalidate_dashboards, invalidate_profile_dashboards
+from mongo_admin_stats import daily_trends, top_donors, top_recipients, category_status_stats, \
+    donation_category_facets
+from mongo_metrics import metrics_snapshot, refresh_metrics, invalidate_metrics, snapshot_age, start_metrics_refresher
+from mongo_panels import run_panels, server_timing
+from mongo_archive import ACTIVITY_ARCHIVE, archived_activities, delete_archived_activity, delete_archived_activities
 
 def ensure_mongo_connection():
     """Ensure MongoDB connection is established"""
@@ -43,6 +58,10 @@ def mongo_admin_login_required(view_func):
         return view_func(request, *args, **kwargs)
     return wrapper
 
+# Only the contact fields of users are shown next to donations and activities
+USER_CONTACT_FIELDS = ('name', 'email')
+
+
 @mongo_admin_login_required
 def mongo_admin_dashboard(request):
     """MongoDB-based admin dashboard"""
@@ -50,185 +69,81 @@ def mongo_admin_dashboard(request):
     
     # Get time period filter
     days = int(request.GET.get('days', 30))
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    # User Statistics
-    total_users = MongoUser.objects.count()
-    active_users = MongoUser.objects(is_active=True).count()
-    blocked_users = MongoUser.objects(is_active=False).count()
-    new_users_period = MongoUser.objects(date_joined__gte=start_date).count()
-    
-    # Donation Statistics
-    total_donations = MongoDonation.objects.count()
-    available_donations = MongoDonation.objects(status='available').count()
-    claimed_donations = MongoDonation.objects(status='claimed').count()
-    shipped_donations = MongoDonation.objects(status='shipped').count()
-    unavailable_donations = MongoDonation.objects(status='unavailable').count()
-    new_donations_period = MongoDonation.objects(created_at__gte=start_date).count()
-    
-    # Activity Statistics
-    total_activities = MongoActivity.objects.count()
-    available_activities = MongoActivity.objects.count()  # All activities are available by default
-    joined_activities = MongoVolunteerActivity.objects(status='joined').count()
-    completed_activities = MongoVolunteerActivity.objects(status='completed').count()
-    cancelled_activities = MongoVolunteerActivity.objects(status='cancelled').count()
-    
-    # Recent Data with proper relationships
-    recent_donations_data = []
-    recent_donations = MongoDonation.objects.order_by('-created_at')[:10]
-    for donation in recent_donations:
-        item = MongoItem.objects(id=donation.item_id).first()
-        donor = MongoDonor.objects(id=donation.donor_id).first()
-        donor_user = MongoUser.objects(id=donor.user_id).first() if donor else None
-        recipient = MongoRecipient.objects(id=donation.recipient_id).first() if donation.recipient_id else None
-        recipient_user = MongoUser.objects(id=recipient.user_id).first() if recipient else None
-        
-        donation_data = {
-            'id': donation.id,
-            'status': donation.status,
-            'created_at': donation.created_at,
-            'item': item,
-            'donor_name': donor_user.name if donor_user else 'Unknown',
-            'donor_email': donor_user.email if donor_user else 'Unknown',
-            'recipient_name': recipient_user.name if recipient_user else None,
-            'recipient_email': recipient_user.email if recipient_user else None,
-        }
-        recent_donations_data.append(donation_data)
-    
-    recent_users = MongoUser.objects.order_by('-date_joined')[:10]
-    
-    # Top Donors
-    top_donors_data = []
-    donors = MongoDonor.objects.all()
-    for donor in donors:
-        donation_count = MongoDonation.objects(donor_id=donor.id).count()
-        if donation_count > 0:
-            user = MongoUser.objects(id=donor.user_id).first()
-            if user:
-                top_donors_data.append({
-                    'user': user,
-                    'donation_count': donation_count
-                })
-    
-    top_donors = sorted(top_donors_data, key=lambda x: x['donation_count'], reverse=True)[:10]
-    
-    # Top Recipients
-    top_recipients_data = []
-    recipients = MongoRecipient.objects.all()
-    for recipient in recipients:
-        claimed_count = MongoDonation.objects(recipient_id=recipient.id).count()
-        if claimed_count > 0:
-            user = MongoUser.objects(id=recipient.user_id).first()
-            if user:
-                top_recipients_data.append({
-                    'user': user,
-                    'claimed_count': claimed_count
-                })
-    
-    top_recipients = sorted(top_recipients_data, key=lambda x: x['claimed_count'], reverse=True)[:10]
-    
-    # All Donations for table with proper relationships
-    all_donations_data = []
-    all_donations = MongoDonation.objects.order_by('-created_at')
-    for donation in all_donations:
-        item = MongoItem.objects(id=donation.item_id).first()
-        donor = MongoDonor.objects(id=donation.donor_id).first()
-        donor_user = MongoUser.objects(id=donor.user_id).first() if donor else None
-        recipient = MongoRecipient.objects(id=donation.recipient_id).first() if donation.recipient_id else None
-        recipient_user = MongoUser.objects(id=recipient.user_id).first() if recipient else None
-        
-        donation_data = {
-            'id': donation.id,
-            'status': donation.status,
-            'created_at': donation.created_at,
-            'item': item,
-            'donor_name': donor_user.name if donor_user else 'Unknown',
-            'donor_email': donor_user.email if donor_user else 'Unknown',
-            'recipient_name': recipient_user.name if recipient_user else None,
-            'recipient_email': recipient_user.email if recipient_user else None,
-        }
-        all_donations_data.append(donation_data)
-    
-    # Donation Category Statistics
-    donation_category_stats = []
-    categories = MongoItem.objects.distinct('category')
-    for category in categories:
-        items = MongoItem.objects(category=category)
-        item_ids = [item.id for item in items]
-        donations = MongoDonation.objects(item_id__in=item_ids)
-        
-        stats = {
-            'item__category': category,
-            'total_count': donations.count(),
-            'available_count': donations(status='available').count(),
-            'claimed_count': donations(status='claimed').count(),
-            'shipped_count': donations(status='shipped').count(),
-        }
-        donation_category_stats.append(stats)
-    
-    # Volunteer Activity Trends (last 30 days)
-    volunteer_activity_trends = []
-    for i in range(30):
-        date = datetime.utcnow() - timedelta(days=i)
-        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = date.replace(hour=23, minute=59, second=59, microsecond=999999)
-        
-        activities_created = MongoActivity.objects(
-            created_at__gte=start_of_day,
-            created_at__lte=end_of_day
-        ).count()
-        
-        activities_completed = MongoVolunteerActivity.objects(
-            status='completed',
-            created_at__gte=start_of_day,
-            created_at__lte=end_of_day
-        ).count()
-        
-        volunteer_activity_trends.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'activities_created': activities_created,
-            'activities_completed': activities_completed
-        })
-    
-    # Reverse to show oldest to newest (so today is at the end)
-    volunteer_activity_trends.reverse()
     
+    # Independent panels, evaluated concurrently; a panel that is too slow renders a placeholder
+    start_metrics_refresher()
+    panels, panel_timings, unavailable_panels = run_panels({
+        # Headline counts from the materialized snapshot
+        'metrics': (metrics_snapshot, {}),
+        # Daily trends for the selected period, one aggregation per series
+        'trends': (lambda: daily_trends(days), []),
+        'recent_users': (lambda: list(MongoUser.objects.order_by('-date_joined')[:10]), []),
+        # Leaderboards, ranked in the database
+        'top_donors': (top_donors, []),
+        'top_recipients': (top_recipients, []),
+        # First page of all donations, joined in one aggregation; later pages come from the JSON endpoint
+        'donations': (lambda: donation_table_page({}), []),
+        # Donations per category and status, one aggregation
+        'category_stats': (category_status_stats, []),
+    })
+    
+    metrics = panels['metrics']
+    volunteer_activity_trends = panels['trends']
+    all_donations_data = panels['donations']
     
     # Volunteer Activity Status
     volunteer_activity_status = {
-        'available': MongoVolunteerActivity.objects(status='joined').count(),
-        'completed': MongoVolunteerActivity.objects(status='completed').count(),
-        'cancelled': MongoVolunteerActivity.objects(status='cancelled').count(),
+        'available': metrics.get('joined_participations'),
+        'completed': metrics.get('completed_participations'),
+        'cancelled': metrics.get('cancelled_participations'),
     }
     
     context = {
-        'total_users': total_users,
-        'active_users': active_users,
-        'blocked_users': blocked_users,
-        'new_users_period': new_users_period,
-        'total_donations': total_donations,
-        'available_donations': available_donations,
-        'claimed_donations': claimed_donations,
-        'shipped_donations': shipped_donations,
-        'unavailable_donations': unavailable_donations,
-        'new_donations_period': new_donations_period,
-        'total_activities': total_activities,
-        'available_activities': available_activities,
-        'joined_activities': joined_activities,
-        'completed_activities': completed_activities,
-        'cancelled_activities': cancelled_activities,
-        'recent_donations': recent_donations_data,
-        'recent_users': recent_users,
-        'top_donors': top_donors,
-        'top_recipients': top_recipients,
+        'total_users': metrics.get('total_users'),
+        'active_users': metrics.get('active_users'),
+        'blocked_users': metrics.get('blocked_users'),
+        'new_users_period': sum(day['signups'] for day in volunteer_activity_trends),
+        'total_donations': metrics.get('total_donations'),
+        'available_donations': metrics.get('available_donations'),
+        'claimed_donations': metrics.get('claimed_donations'),
+        'shipped_donations': metrics.get('shipped_donations'),
+        'unavailable_donations': metrics.get('unavailable_donations'),
+        'new_donations_period': sum(day['donations_created'] for day in volunteer_activity_trends),
+        'total_activities': metrics.get('total_activities'),
+        'available_activities': metrics.get('live_activities'),  # Live activities are available by default
+        'joined_activities': metrics.get('joined_participations'),
+        'completed_activities': metrics.get('completed_participations'),
+        'cancelled_activities': metrics.get('cancelled_participations'),
+        'metrics_computed_at': metrics.get('computed_at'),
+        'metrics_age_minutes': snapshot_age(metrics) // 60 if metrics else None,
+        # The recent donations panel shows the newest rows of the all donations page
+        'recent_donations': all_donations_data[:10],
+        'recent_users': panels['recent_users'],
+        'top_donors': panels['top_donors'],
+        'top_recipients': panels['top_recipients'],
         'all_donations': all_donations_data,
-        'donation_category_stats': donation_category_stats,
+        'donation_category_stats': panels['category_stats'],
         'volunteer_activity_trends': volunteer_activity_trends,
         'volunteer_activity_status': volunteer_activity_status,
+        'unavailable_panels': unavailable_panels,
         'days': days,
     }
     
-    return render(request, 'admin/admin_dashboard.html', context)
+    response = render(request, 'admin/admin_dashboard.html', context)
+    response['Server-Timing'] = server_timing(panel_timings)
+    return response
+
+@mongo_admin_login_required
+def mongo_admin_refresh_metrics(request):
+    """Recompute the dashboard metrics snapshot now"""
+    if request.method == 'POST':
+        ensure_mongo_connection()
+        try:
+            refresh_metrics()
+            messages.success(request, 'Dashboard metrics refreshed.')
+        except Exception as e:
+            messages.error(request, f'Error refreshing metrics: {str(e)}')
+    return redirect('admin_dashboard')
 
 @mongo_admin_login_required
 def mongo_admin_user_management(request):
@@ -240,54 +155,8 @@ def mongo_admin_user_management(request):
     status_filter = request.GET.get('status', '')
     role_filter = request.GET.get('role', '')
     
-    # Build query
-    query = {}
-    if search:
-        query['$or'] = [
-            {'name': {'$regex': search, '$options': 'i'}},
-            {'email': {'$regex': search, '$options': 'i'}}
-        ]
-    if status_filter:
-        query['is_active'] = status_filter == 'active'
-    
-    users = MongoUser.objects(**query).order_by('-date_joined')
-    
-    # Add role information to users
-    users_with_roles = []
-    for user in users:
-        donor = MongoDonor.objects(user_id=user.id).first()
-        recipient = MongoRecipient.objects(user_id=user.id).first()
-        volunteer = MongoVolunteer.objects(user_id=user.id).first()
-        
-        user_data = {
-            'id': user.id,
-            'name': user.name,
-            'email': user.email,
-            'phone': user.phone,
-            'is_active': user.is_active,
-            'date_joined': user.date_joined,
-            'is_donor': donor is not None,
-            'is_recipient': recipient is not None,
-            'is_volunteer': volunteer is not None,
-        }
-        users_with_roles.append(user_data)
-    
-    # Apply role filter
-    if role_filter:
-        filtered_users = []
-        for user in users_with_roles:
-            if role_filter == 'donor' and user['is_donor']:
-                filtered_users.append(user)
-            elif role_filter == 'recipient' and user['is_recipient']:
-                filtered_users.append(user)
-            elif role_filter == 'volunteer' and user['is_volunteer']:
-                filtered_users.append(user)
-        users_with_roles = filtered_users
-    
-    # Pagination
-    paginator = Paginator(users_with_roles, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Status, role and search are applied, and the page cut, in one aggregation
+    page_obj = user_table_page(request.GET, status=status_filter, role=role_filter, search=search)
     
     context = {
         'users': page_obj,
@@ -308,57 +177,16 @@ def mongo_admin_donation_management(request):
     status_filter = request.GET.get('status', '')
     category_filter = request.GET.get('category', '')
     
-    # Build query
-    query = {}
-    if status_filter:
-        query['status'] = status_filter
-    
-    donations = MongoDonation.objects(**query).order_by('-created_at')
-    
-    # Add relationship data to donations
-    donations_with_data = []
-    for donation in donations:
-        item = MongoItem.objects(id=donation.item_id).first()
-        donor = MongoDonor.objects(id=donation.donor_id).first()
-        donor_user = MongoUser.objects(id=donor.user_id).first() if donor else None
-        recipient = MongoRecipient.objects(id=donation.recipient_id).first() if donation.recipient_id else None
-        recipient_user = MongoUser.objects(id=recipient.user_id).first() if recipient else None
-        
-        donation_data = {
-            'id': donation.id,
-            'status': donation.status,
-            'created_at': donation.created_at,
-            'item': item,
-            'donor_name': donor_user.name if donor_user else 'Unknown',
-            'donor_email': donor_user.email if donor_user else 'Unknown',
-            'recipient_name': recipient_user.name if recipient_user else None,
-            'recipient_email': recipient_user.email if recipient_user else None,
-        }
-        donations_with_data.append(donation_data)
-    
-    # Apply search filter
-    if search:
-        filtered_donations = []
-        for donation in donations_with_data:
-            if donation['item'] and (search.lower() in donation['item'].name.lower() or search.lower() in donation['item'].description.lower()):
-                filtered_donations.append(donation)
-        donations_with_data = filtered_donations
-    
-    # Apply category filter
-    if category_filter:
-        filtered_donations = []
-        for donation in donations_with_data:
-            if donation['item'] and donation['item'].category == category_filter:
-                filtered_donations.append(donation)
-        donations_with_data = filtered_donations
-    
-    # Pagination
-    paginator = Paginator(donations_with_data, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # One joined aggregation per page; filters on item fields run inside MongoDB
+    page_obj = donation_table_page(
+        request.GET,
+        status='' if status_filter == 'all' else status_filter,
+        category='' if category_filter == 'all' else category_filter,
+        search=search,
+    )
     
-    # Get categories for filter
-    categories = MongoItem.objects.distinct('category')
+    # Get categories for filter, counted across every status
+    categories = donation_category_facets()
     
     context = {
         'donations': page_obj,
@@ -370,6 +198,33 @@ def mongo_admin_donation_management(request):
     
     return render(request, 'admin/donation_management.html', context)
 
+@mongo_admin_login_required
+def mongo_admin_donations_table(request):
+    """JSON page of the donations table (rendered rows plus the next cursor), with the management filters"""
+    ensure_mongo_connection()
+    
+    status_filter = request.GET.get('status', '')
+    category_filter = request.GET.get('category', '')
+    page_obj = donation_table_page(
+        request.GET,
+        status='' if status_filter == 'all' else status_filter,
+        category='' if category_filter == 'all' else category_filter,
+        search=request.GET.get('search', ''),
+    )
+    
+    return JsonResponse({
+        'html': render_to_string('admin/_donation_rows.html', {'donations': page_obj}, request=request),
+        'donations': [{
+            'id': str(donation['id']),
+            'status': donation['status'],
+            'created_at': donation['created_at'].isoformat() if donation['created_at'] else None,
+            'item_name': (donation['item'] or {}).get('name'),
+            'donor_name': donation['donor_name'],
+            'recipient_name': donation['recipient_name'],
+        } for donation in page_obj],
+        'next_cursor': page_obj.next_cursor,
+    })
+
 @mongo_admin_login_required
 def mongo_admin_activity_management(request):
     """MongoDB-based activity management"""
@@ -378,24 +233,37 @@ def mongo_admin_activity_management(request):
     # Get filter parameters
     search = request.GET.get('search', '')
     category_filter = request.GET.get('category', '')
+    history = request.GET.get('history') == '1'
     
     # Build query
     query = {}
-    if search:
-        query['$or'] = [
-            {'title': {'$regex': search, '$options': 'i'}},
-            {'description': {'$regex': search, '$options': 'i'}}
-        ]
-    if category_filter:
+    if category_filter and category_filter != 'all':
         query['category'] = category_filter
     
-    activities = MongoActivity.objects(**query).order_by('-created_at')
-    
-    # Add organizer information to activities
+    if history:
+        # Live and archived activities paged together on (created_at, _id);
+        # the text index only covers the live collection, so search by regex
+        if search.strip():
+            query.update(regex_match(search, ('title', 'description')))
+        page_obj = keyset_aggregate(
+            MongoActivity, query, request.GET, ADMIN_PAGE_SIZE,
+            filter_stages=[{'$project': dict.fromkeys(ADMIN_ACTIVITY_FIELDS + ('archived_at',), 1)}],
+            union_with=ACTIVITY_ARCHIVE, wrap=Row,
+        )
+    else:
+        activities = search_queryset(MongoActivity.objects(**query), search, ('title', 'description'), '-created_at')
+
+        # Keyset pagination on (created_at, _id)
+        page_obj = keyset_page(activities, request.GET, ADMIN_PAGE_SIZE, ranked=use_text_search(search),
+                               fields=ADMIN_ACTIVITY_FIELDS)
+    
+    # Add organizer information to the activities on this page
+    volunteers = loader(request, MongoVolunteer).load_many(related(page_obj, 'volunteer_id'))
+    users = loader(request, MongoUser, USER_CONTACT_FIELDS)
+    users.load_many(related(volunteers, 'user_id'))
     activities_with_data = []
-    for activity in activities:
-        volunteer = MongoVolunteer.objects(id=activity.volunteer_id).first()
-        volunteer_user = MongoUser.objects(id=volunteer.user_id).first() if volunteer else None
+    for activity, volunteer in zip(page_obj, volunteers):
+        volunteer_user = users.load(volunteer.user_id) if volunteer else None
         
         activity_data = {
             'id': activity.id,
@@ -409,22 +277,20 @@ def mongo_admin_activity_management(request):
             'image_url': activity.image_url,
             'organizer_name': volunteer_user.name if volunteer_user else 'Unknown',
             'organizer_email': volunteer_user.email if volunteer_user else 'Unknown',
+            'archived_at': activity.archived_at,
         }
         activities_with_data.append(activity_data)
-    
-    # Pagination
-    paginator = Paginator(activities_with_data, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj.object_list = activities_with_data
     
     # Get categories for filter
-    categories = MongoActivity.objects.distinct('category')
+    categories = activity_facets()
     
     context = {
         'activities': page_obj,
         'search_query': search,
         'category_filter': category_filter,
         'categories': categories,
+        'history': history,
     }
     
     return render(request, 'admin/activity_management.html', context)
@@ -438,11 +304,16 @@ def mongo_admin_activity_logs(request):
     recent_activities = []
     
     # Recent donations
-    recent_donations = MongoDonation.objects.order_by('-created_at')[:20]
-    for donation in recent_donations:
-        item = MongoItem.objects(id=donation.item_id).first()
-        donor = MongoDonor.objects(id=donation.donor_id).first()
-        donor_user = MongoUser.objects(id=donor.user_id).first() if donor else None
+    recent_donations = list(MongoDonation.objects.order_by('-created_at')[:20])
+    items = loader(request, MongoItem, ('name',)).load_many(related(recent_donations, 'item_id'))
+    donors = loader(request, MongoDonor).load_many(related(recent_donations, 'donor_id'))
+    recent_volunteer_activities = list(MongoActivity.objects.order_by('-created_at')[:20])
+    volunteers = loader(request, MongoVolunteer).load_many(related(recent_volunteer_activities, 'volunteer_id'))
+    users = loader(request, MongoUser, USER_CONTACT_FIELDS)
+    users.load_many(related(donors, 'user_id') + related(volunteers, 'user_id'))
+
+    for donation, item, donor in zip(recent_donations, items, donors):
+        donor_user = users.load(donor.user_id) if donor else None
         
         recent_activities.append({
             'type': 'donation',
@@ -453,10 +324,8 @@ def mongo_admin_activity_logs(request):
         })
     
     # Recent activities
-    recent_volunteer_activities = MongoActivity.objects.order_by('-created_at')[:20]
-    for activity in recent_volunteer_activities:
-        volunteer = MongoVolunteer.objects(id=activity.volunteer_id).first()
-        volunteer_user = MongoUser.objects(id=volunteer.user_id).first() if volunteer else None
+    for activity, volunteer in zip(recent_volunteer_activities, volunteers):
+        volunteer_user = users.load(volunteer.user_id) if volunteer else None
         
         recent_activities.append({
             'type': 'activity',
@@ -499,9 +368,9 @@ def mongo_admin_user_detail(request, user_id):
         # Get user's donations
         user_donations = []
         if donor:
-            donations = MongoDonation.objects(donor_id=donor.id)
-            for donation in donations:
-                item = MongoItem.objects(id=donation.item_id).first()
+            donations = list(MongoDonation.objects(donor_id=donor.id))
+            items = loader(request, MongoItem).load_many(related(donations, 'item_id'))
+            for donation, item in zip(donations, items):
                 user_donations.append({
                     'donation': donation,
                     'item': item
@@ -510,9 +379,9 @@ def mongo_admin_user_detail(request, user_id):
         # Get user's claimed donations
         claimed_donations = []
         if recipient:
-            donations = MongoDonation.objects(recipient_id=recipient.id)
-            for donation in donations:
-                item = MongoItem.objects(id=donation.item_id).first()
+            donations = list(MongoDonation.objects(recipient_id=recipient.id))
+            items = loader(request, MongoItem).load_many(related(donations, 'item_id'))
+            for donation, item in zip(donations, items):
                 claimed_donations.append({
                     'donation': donation,
                     'item': item
@@ -522,7 +391,7 @@ def mongo_admin_user_detail(request, user_id):
         user_activities = []
         if volunteer:
             activities = MongoActivity.objects(volunteer_id=volunteer.id)
-            user_activities = list(activities)
+            user_activities = list(activities) + archived_activities({'volunteer_id': volunteer.id})
         
         context = {
             'user': user,
@@ -550,6 +419,7 @@ def mongo_admin_toggle_user_status(request, user_id):
             if user:
                 user.is_active = not user.is_active
                 user.save()
+                invalidate_metrics()
                 status = 'activated' if user.is_active else 'blocked'
                 messages.success(request, f'User {status} successfully.')
             else:
@@ -575,6 +445,7 @@ def mongo_admin_delete_user(request, user_id):
                     for item in items:
                         MongoDonation.objects(item_id=item.id).delete()
                         item.delete()
+                    remove_donor_listings(donor.id)
                     donor.delete()
                 
                 recipient = MongoRecipient.objects(user_id=user.id).first()
@@ -590,10 +461,14 @@ def mongo_admin_delete_user(request, user_id):
                     for activity in activities:
                         MongoVolunteerActivity.objects(activity_id=activity.id).delete()
                         activity.delete()
+                    delete_archived_activities(volunteer.id)
+                    invalidate_activities()
                     volunteer.delete()
                 
                 # Delete user
                 user.delete()
+                invalidate_roles(request)
+                invalidate_metrics()
                 messages.success(request, 'User and all related data deleted successfully.')
             else:
                 messages.error(request, 'User not found.')
@@ -615,6 +490,10 @@ def mongo_admin_ship_donation(request, donation_id):
             if donation:
                 donation.status = 'shipped'
                 donation.save()
+                sync_listing(donation)
+                invalidate_profile_dashboards(MongoDonor, donation.donor_id)
+                invalidate_profile_dashboards(MongoRecipient, donation.recipient_id)
+                invalidate_metrics()
                 messages.success(request, 'Donation marked as shipped.')
             else:
                 messages.error(request, 'Donation not found.')
@@ -639,6 +518,10 @@ def mongo_admin_delete_donation(request, donation_id):
                 if item:
                     item.delete()
                 donation.delete()
+                remove_listing(donation.id)
+                invalidate_profile_dashboards(MongoDonor, donation.donor_id)
+                invalidate_profile_dashboards(MongoRecipient, donation.recipient_id)
+                invalidate_metrics()
                 messages.success(request, 'Donation deleted successfully.')
             else:
                 messages.error(request, 'Donation not found.')
@@ -659,9 +542,17 @@ def mongo_admin_delete_activity(request, activity_id):
             activity = MongoActivity.objects(id=ObjectId(activity_id)).first()
             if activity:
                 # Delete related volunteer activities
+                participants = MongoVolunteerActivity.objects(activity_id=activity.id).distinct('participant_id')
                 MongoVolunteerActivity.objects(activity_id=activity.id).delete()
                 activity.delete()
+                invalidate_activities()
+                invalidate_profile_dashboards(MongoVolunteer, activity.volunteer_id)
+                invalidate_dashboards(*participants)
+                invalidate_metrics()
                 messages.success(request, 'Activity deleted successfully.')
+            elif delete_archived_activity(ObjectId(activity_id)):
+                invalidate_metrics()
+                messages.success(request, 'Archived activity deleted successfully.')
             else:
                 messages.error(request, 'Activity not found.')
         except Exception as e:
@@ -4,13 +4,25 @@ These views completely replace Django ORM with MongoDB operations
 """
 
 from django.shortcuts import render
+from django.http import JsonResponse
 from django.contrib.auth import get_user_model, login as dj_login
-from django.core.paginator import Paginator
 from datetime import datetime
 from mongo_utils import connect_to_mongodb, get_mongodb_connection, ensure_mongodb_connection
 from mongo_models import User as MongoUser, Donor as MongoDonor, Recipient as MongoRecipient, \
     Volunteer as MongoVolunteer, Item as MongoItem, Donation as MongoDonation, \
     Activity as MongoActivity, VolunteerActivity as MongoVolunteerActivity, Address
+from mongo_catalog import available_donations_page
+from mongo_listings import sync_listing, remove_listing
+from mongo_search import search_queryset, use_text_search, regex_match
+from mongo_pagination import keyset_page
+from mongo_facets import Facet, donation_facets, activity_facets, invalidate_activities, CATALOG_NAMESPACE
+from mongo_geo import geo_point, near_filter, nearby_page, RADIUS_CHOICES
+from mongo_roles import get_roles, invalidate_roles
+from mongo_participation import joined_activity_ids, join_activity, leave_activity, \
+    ALREADY_JOINED, FULL, NOT_FOUND
+from mongo_projection import ACTIVITY_LIST_FIELDS
+from mongo_dashboards import donor_dashboard, recipient_dashboard, volunteer_dashboard, \
+    available_preview_page, catalog_entry_json, cached_section, invalidate_dashboards, invalidate_profile_dashboards
 from django.contrib.auth.hashers import check_password, make_password
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
@@ -194,12 +206,14 @@ def onboarding(request):
 
         # MongoDB is available, create profiles normally
         try:
-            if want_donor and not MongoDonor.objects(user_id=user.id).first():     
+            roles = get_roles(user.id, request)
+            if want_donor and not roles.is_donor:
                 MongoDonor(user_id=user.id).save()
-            if want_recipient and not MongoRecipient.objects(user_id=user.id).first(): 
+            if want_recipient and not roles.is_recipient:
                 MongoRecipient(user_id=user.id).save()
-            if want_volunteer and not MongoVolunteer.objects(user_id=user.id).first(): 
+            if want_volunteer and not roles.is_volunteer:
                 MongoVolunteer(user_id=user.id).save()
+            invalidate_roles(request)
         except Exception as e:
             logger.error(f"Error creating MongoDB profiles: {e}")
             # Fall back to session storage
@@ -235,9 +249,10 @@ def dashboard_selection_view(request):
         has_volunteer = user_roles.get('is_volunteer', False)
     else:
         # בדיקת התפקידים במונגו
-        has_donor = MongoDonor.objects(user_id=user.id).first() is not None
-        has_recipient = MongoRecipient.objects(user_id=user.id).first() is not None
-        has_volunteer = MongoVolunteer.objects(user_id=user.id).first() is not None
+        roles = get_roles(user.id, request)
+        has_donor = roles.is_donor
+        has_recipient = roles.is_recipient
+        has_volunteer = roles.is_volunteer
 
     # אם אין שום תפקיד – לעמוד "no roles"
     if not (has_donor or has_recipient or has_volunteer):
@@ -271,11 +286,7 @@ def profile_redirect_view(request):
     if not user:
         return redirect('login')
 
-    has_donor = bool(MongoDonor.objects(user_id=user.id).first())
-    has_recipient = bool(MongoRecipient.objects(user_id=user.id).first())
-    has_volunteer = bool(MongoVolunteer.objects(user_id=user.id).first())
-
-    if has_donor or has_recipient or has_volunteer:
+    if get_roles(user.id, request).role_count:
         return redirect('dashboard_selection')  # משתמש ותיק עם תפקידים -> מסך בחירה
     if getattr(user, 'is_staff', False) or getattr(user, 'is_superuser', False):
         return redirect('admin_dashboard')
@@ -346,7 +357,8 @@ class MongoUserMixin:
             apartment=address_data.get('apartment', ''),
             instructions=address_data.get('instructions', ''),
             latitude=address_data.get('latitude'),
-            longitude=address_data.get('longitude')
+            longitude=address_data.get('longitude'),
+            point=geo_point(address_data.get('latitude'), address_data.get('longitude'))
         )
 
         # Create user
@@ -508,6 +520,7 @@ def mongo_register_view(request):
             'latitude': float(request.POST.get('latitude', 0)) if request.POST.get('latitude') else None,
             'longitude': float(request.POST.get('longitude', 0)) if request.POST.get('longitude') else None
         }
+        address_data['point'] = geo_point(address_data['latitude'], address_data['longitude'])
 
         # Create user
         user = MongoUser(
@@ -698,9 +711,8 @@ def mongo_dashboard_view(request):
         return redirect('login')
 
     # Determine user type and get relevant data
-    donor = MongoDonor.objects(user_id=user.id).first()
-    recipient = MongoRecipient.objects(user_id=user.id).first()
-    volunteer = MongoVolunteer.objects(user_id=user.id).first()
+    roles = get_roles(user.id, request)
+    donor, recipient, volunteer = roles.donor, roles.recipient, roles.volunteer
 
     context = {
         'user': user,
@@ -710,7 +722,7 @@ def mongo_dashboard_view(request):
     }
 
     # Check if user has multiple profiles
-    profile_count = sum([donor is not None, recipient is not None, volunteer is not None])
+    profile_count = roles.role_count
 
     # Check if user is accessing a specific dashboard URL
     request_path = request.path
@@ -748,154 +760,41 @@ def mongo_dashboard_view(request):
     # Check which specific dashboard to show based on URL path
     if '/dashboard/volunteer/' in request_path and volunteer:
         # User wants volunteer dashboard and has volunteer profile
-        activities = MongoActivity.objects(volunteer_id=volunteer.id)
-        volunteer_activities = MongoVolunteerActivity.objects(volunteer_id=volunteer.id)
-
-        # Calculate volunteer statistics
-        total_activities = activities.count()
-        available_activities = activities.count()  # All activities are available by default
-        joined_count = volunteer_activities.count()
-        completed_count = volunteer_activities(status='completed').count()
-
-        context.update({
-            'activities': activities,
-            'volunteer_activities': volunteer_activities,
-            'total_activities': total_activities,
-            'available_activities': available_activities,
-            'joined_count': joined_count,
-            'completed_count': completed_count,
-        })
+        # Organized activities, joined activities and counts in two queries
+        context.update(cached_section(user.id, 'volunteer', lambda: volunteer_dashboard(volunteer.id)))
         return render(request, 'dashboard/volunteer_dashboard.html', context)
 
     elif '/dashboard/recipient/' in request_path and recipient:
         # User wants recipient dashboard and has recipient profile
-        available_donations = MongoDonation.objects(status='available')
-        claimed_donations = MongoDonation.objects(recipient_id=recipient.id)
-
-        # Calculate recipient statistics
-        total_claimed = claimed_donations.count()
-        available_items = available_donations.count()
-
-        context.update({
-            'donations': available_donations,
-            'total_claimed': total_claimed,
-            'available_items': available_items,
-        })
+        # Claimed history page, first available donations and counts
+        context.update(cached_section(user.id, 'recipient', lambda: recipient_dashboard(recipient.id, request.GET),
+                                      request.GET, depends_on=(CATALOG_NAMESPACE,)))
         return render(request, 'dashboard/recipient_dashboard.html', context)
 
     elif '/dashboard/donor/' in request_path and donor:
         # User wants donor dashboard and has donor profile
-        items = MongoItem.objects(donor_id=donor.id)
-        donations = MongoDonation.objects(donor_id=donor.id)
-
-        # Populate item data for donations
-        donations_with_items = []
-        for donation in donations:
-            item = MongoItem.objects(id=donation.item_id).first()
-            if item:
-                # Create a mock object that has both donation and item properties
-                class DonationWithItem:
-                    def __init__(self, donation, item):
-                        self.id = donation.id
-                        self.status = donation.status
-                        self.created_at = donation.created_at
-                        self.donor_id = donation.donor_id
-                        self.recipient_id = donation.recipient_id
-                        self.item = item
-
-                donations_with_items.append(DonationWithItem(donation, item))
-
-        # Calculate donor statistics
-        total_donations = donations.count()
-        available_donations = donations(status='available').count()
-        claimed_donations = donations(status='claimed').count()
-        people_helped = donations(status__in=['claimed', 'shipped']).count()
-
-        context.update({
-            'items': items,
-            'donations': donations_with_items,
-            'total_donations': total_donations,
-            'available_donations': available_donations,
-            'claimed_donations': claimed_donations,
-            'people_helped': people_helped,
-        })
+        # Donations with their items and the status counts in one $facet aggregation
+        context.update(cached_section(user.id, 'donor', lambda: donor_dashboard(donor.id, request.GET), request.GET))
         return render(request, 'dashboard/donor_dashboard.html', context)
 
     # If no specific dashboard URL or user has single profile, show appropriate dashboard
     elif donor:
-        # Get donor's items and donations
-        items = MongoItem.objects(donor_id=donor.id)
-        donations = MongoDonation.objects(donor_id=donor.id)
-
-        # Populate item data for donations
-        donations_with_items = []
-        for donation in donations:
-            item = MongoItem.objects(id=donation.item_id).first()
-            if item:
-                # Create a mock object that has both donation and item properties
-                class DonationWithItem:
-                    def __init__(self, donation, item):
-                        self.id = donation.id
-                        self.status = donation.status
-                        self.created_at = donation.created_at
-                        self.donor_id = donation.donor_id
-                        self.recipient_id = donation.recipient_id
-                        self.item = item
-
-                donations_with_items.append(DonationWithItem(donation, item))
-
-        # Calculate donor statistics
-        total_donations = donations.count()
-        available_donations = donations(status='available').count()
-        claimed_donations = donations(status='claimed').count()
-        people_helped = donations(status__in=['claimed', 'shipped']).count()
-
-        context.update({
-            'items': items,
-            'donations': donations_with_items,
-            'total_donations': total_donations,
-            'available_donations': available_donations,
-            'claimed_donations': claimed_donations,
-            'people_helped': people_helped,
-        })
+        # Donations with their items and the status counts in one $facet aggregation
+        context.update(cached_section(user.id, 'donor', lambda: donor_dashboard(donor.id, request.GET), request.GET))
         return render(request, 'dashboard/donor_dashboard.html', context)
 
     elif recipient:
-        # Get available donations and recipient's claimed items
-        available_donations = MongoDonation.objects(status='available')
-        claimed_donations = MongoDonation.objects(recipient_id=recipient.id)
-
-        # Calculate recipient statistics
-        total_claimed = claimed_donations.count()
-        available_items = available_donations.count()
-
+        # Claimed history page, first available donations and counts
+        context.update(cached_section(user.id, 'recipient', lambda: recipient_dashboard(recipient.id, request.GET),
+                                      request.GET, depends_on=(CATALOG_NAMESPACE,)))
         context.update({
-            'donations': available_donations,
-            'total_claimed': total_claimed,
-            'available_items': available_items,
             'current_dashboard': 'recipient',
         })
         return render(request, 'dashboard/recipient_dashboard.html', context)
 
     elif volunteer:
-        # Get volunteer's activities
-        activities = MongoActivity.objects(volunteer_id=volunteer.id)
-        volunteer_activities = MongoVolunteerActivity.objects(volunteer_id=volunteer.id)
-
-        # Calculate volunteer statistics
-        total_activities = activities.count()
-        available_activities = activities.count()  # All activities are available by default
-        joined_count = volunteer_activities.count()
-        completed_count = volunteer_activities(status='completed').count()
-
-        context.update({
-            'activities': activities,
-            'volunteer_activities': volunteer_activities,
-            'total_activities': total_activities,
-            'available_activities': available_activities,
-            'joined_count': joined_count,
-            'completed_count': completed_count,
-        })
+        # Organized activities, joined activities and counts in two queries
+        context.update(cached_section(user.id, 'volunteer', lambda: volunteer_dashboard(volunteer.id)))
         return render(request, 'dashboard/volunteer_dashboard.html', context)
 
     else:
@@ -903,6 +802,22 @@ def mongo_dashboard_view(request):
         return render(request, 'dashboard/dashboard_selection.html', context)
 
 
+def mongo_recipient_available_donations(request):
+    """JSON page of available donations for the recipient dashboard's "load more" button"""
+    user_email = request.session.get('mongo_user_email')
+    user = MongoUser.objects(email=user_email).first() if user_email else None
+    if not user or not user.is_active:
+        return JsonResponse({'error': 'Please log in.'}, status=401)
+    if not get_roles(user.id, request).is_recipient:
+        return JsonResponse({'error': 'Recipient profile required.'}, status=403)
+
+    page_obj = available_preview_page(request.GET)
+    return JsonResponse({
+        'donations': [catalog_entry_json(entry) for entry in page_obj],
+        'next_cursor': page_obj.next_cursor,
+    })
+
+
 def mongo_item_list_view(request):
     """MongoDB-based item list view - shows donations with items"""
     # Check if MongoDB is available
@@ -925,8 +840,8 @@ def mongo_item_list_view(request):
         context = {
             'items': temp_donations,  # Show temporary donations as items
             'donations': temp_donations,
-            'categories': ['Electronics', 'Clothing', 'Books', 'Furniture', 'Toys', 'Other'],
-            'conditions': ['New', 'Like New', 'Good', 'Fair', 'Poor'],
+            'categories': [Facet(name) for name in ['Electronics', 'Clothing', 'Books', 'Furniture', 'Toys', 'Other']],
+            'conditions': [Facet(name) for name in ['New', 'Like New', 'Good', 'Fair', 'Poor']],
             'current_category': '',
             'current_condition': '',
             'search_query': '',
@@ -952,66 +867,22 @@ def mongo_item_list_view(request):
         user = MongoUser.objects(email=user_email).first()
         if user:
             is_authenticated = True
-            # Check if user has recipient profile
-            recipient = MongoRecipient.objects(user_id=user.id).first()
-            is_recipient = recipient is not None
-            # Check if user has donor profile
-            donor = MongoDonor.objects(user_id=user.id).first()
-            is_donor = donor is not None
-
-    # Build query for donations
-    donation_query = {'status': 'available'}  # Only show available donations
-
-    # Get all available donations first
-    donations = MongoDonation.objects(**donation_query)
-
-    # Get items for these donations
-    item_ids = [donation.item_id for donation in donations]
-    item_query = {'id__in': item_ids}
-
-    # Apply filters to items
-    if category:
-        item_query['category'] = category
-    if condition:
-        item_query['condition'] = condition
-    if search:
-        item_query['$or'] = [
-            {'name': {'$regex': search, '$options': 'i'}},
-            {'description': {'$regex': search, '$options': 'i'}}
-        ]
-
-    # Get filtered items
-    items = MongoItem.objects(**item_query).order_by('-created_at')
-
-    # Create donation objects with embedded items for template compatibility
-    donations_with_items = []
-    for item in items:
-        donation = MongoDonation.objects(item_id=item.id, status='available').first()
-        if donation:
-            # Get donor information
-            donor = MongoDonor.objects(id=donation.donor_id).first()
-            donor_user = None
-            if donor:
-                donor_user = MongoUser.objects(id=donor.user_id).first()
-
-            # Create a mock object that has both donation and item properties
-            class DonationWithItem:
-                def __init__(self, donation, item, donor_user):
-                    self.id = donation.id
-                    self.status = donation.status
-                    self.created_at = donation.created_at
-                    self.donor_id = donation.donor_id
-                    self.recipient_id = donation.recipient_id
-                    self.item = item
-                    # Add donor information for template
-                    self.donor = type('Donor', (), {'user': donor_user})() if donor_user else None
-
-            donations_with_items.append(DonationWithItem(donation, item, donor_user))
-
-    # Pagination
-    paginator = Paginator(donations_with_items, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+            roles = get_roles(user.id, request)
+            is_recipient = roles.is_recipient
+            is_donor = roles.is_donor
+
+    # Optional distance filter, around the user's address unless a point is given
+    near, radius_km = near_filter(request.GET, user)
+
+    # One indexed query on the listings read model returns only this page
+    page_obj = available_donations_page(
+        category=category,
+        condition=condition,
+        search=search,
+        params=request.GET,
+        near=near,
+        radius_km=radius_km,
+    )
 
     # Create mock user object for template compatibility
     class MockUser:
@@ -1025,15 +896,19 @@ def mongo_item_list_view(request):
                 self.id = user.id
 
     mock_user = MockUser(user, is_authenticated, is_recipient, is_donor)
+    facets = donation_facets()
 
     context = {
         'items': page_obj,  # For backward compatibility
         'donations': page_obj,  # Main data for template
-        'categories': MongoItem.objects.distinct('category'),
-        'conditions': MongoItem.objects.distinct('condition'),
+        'categories': facets['categories'],
+        'conditions': facets['conditions'],
         'current_category': category,
         'current_condition': condition,
         'search_query': search,
+        'current_near': request.GET.get('near', ''),
+        'current_radius': radius_km,
+        'radius_choices': RADIUS_CHOICES,
         'user': mock_user,  # For template authentication checks
     }
 
@@ -1111,6 +986,7 @@ def mongo_item_create_view(request):
             item_location=request.POST.get('item_location', ''),
             created_at=datetime.utcnow()
         )
+        item.point = geo_point(item.latitude, item.longitude)
         item.save()
 
         # Create donation
@@ -1121,6 +997,8 @@ def mongo_item_create_view(request):
             status='available'
         )
         donation.save()
+        sync_listing(donation, item=item, donor_name=user.name)
+        invalidate_dashboards(user.id)
 
         messages.success(request, 'Item created successfully!')
         return redirect('item_list')
@@ -1166,11 +1044,6 @@ def mongo_activity_list_view(request):
     query = {}
     if category:
         query['category'] = category
-    if search:
-        query['$or'] = [
-            {'title': {'$regex': search, '$options': 'i'}},
-            {'description': {'$regex': search, '$options': 'i'}}
-        ]
 
     # Filter out expired activities (only show future activities)
     from datetime import datetime
@@ -1184,42 +1057,31 @@ def mongo_activity_list_view(request):
     if user_email:
         user = MongoUser.objects(email=user_email).first()
         if user:
-            volunteer_profile = MongoVolunteer.objects(user_id=user.id).first()
+            volunteer_profile = get_roles(user.id, request).volunteer
+
+    near, radius_km = near_filter(request.GET, user)
+    if near:
+        # Nearest first within the radius; $geoNear cannot use the text index
+        geo_query = {'activity_date': {'$gte': query['activity_date__gte']}}
+        if category:
+            geo_query['category'] = category
+        if search.strip():
+            geo_query.update(regex_match(search, ('title', 'description')))
+        page_obj = nearby_page(MongoActivity, near, radius_km, geo_query, request.GET, 12,
+                               fields=ACTIVITY_LIST_FIELDS)
+    else:
+        # Get activities, ranked by relevance when searching
+        activities = search_queryset(MongoActivity.objects(**query), search, ('title', 'description'), '-created_at')
 
-    # Get activities
-    activities = MongoActivity.objects(**query).order_by('-created_at')
+        # Keyset pagination on (created_at, _id)
+        page_obj = keyset_page(activities, request.GET, 12, ranked=use_text_search(search),
+                               fields=ACTIVITY_LIST_FIELDS)
     
-    # Add joined_participants count to each activity
-    for activity in activities:
-        joined_count = MongoVolunteerActivity.objects(
-            activity_id=activity.id,
-            status='joined'
-        ).count()
-        activity.joined_participants = joined_count
-
-    # Pagination
-    paginator = Paginator(activities, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    # Add joined_participants count and user participation status to paginated activities
+    # Participant counts are stored on each activity; one query finds the user's joined ones
+    activity_ids = [activity.id for activity in page_obj]
+    user_joined = joined_activity_ids(volunteer_profile.id, activity_ids) if volunteer_profile else set()
     for activity in page_obj:
-        if not hasattr(activity, 'joined_participants'):
-            joined_count = MongoVolunteerActivity.objects(
-                activity_id=activity.id,
-                status='joined'
-            ).count()
-            activity.joined_participants = joined_count
-        
-        # Check if current user has joined this activity
-        activity.user_has_joined = False
-        if user and volunteer_profile:
-            user_participation = MongoVolunteerActivity.objects(
-                activity_id=activity.id,
-                volunteer_id=volunteer_profile.id,
-                status='joined'
-            ).first()
-            activity.user_has_joined = user_participation is not None
+        activity.user_has_joined = activity.id in user_joined
 
     # Create mock user object for template compatibility
     class MockUser:
@@ -1233,9 +1095,12 @@ def mongo_activity_list_view(request):
     mock_user = MockUser(user, volunteer_profile)
     context = {
         'activities': page_obj,
-        'categories': MongoActivity.objects.distinct('category'),
+        'categories': activity_facets(),
         'current_category': category,
         'search_query': search,
+        'current_near': request.GET.get('near', ''),
+        'current_radius': radius_km,
+        'radius_choices': RADIUS_CHOICES,
         'user': mock_user  # Add user information to context
     }
 
@@ -1288,7 +1153,10 @@ def mongo_activity_create_view(request):
                 requirements=request.POST.get('requirements', ''),
                 contact_info=request.POST.get('contact_info', '')
             )
+            activity.point = geo_point(activity.latitude, activity.longitude)
             activity.save()
+            invalidate_activities()
+            invalidate_dashboards(user.id)
             messages.success(request, 'Activity created successfully!')
             return redirect('activity_list')
         else:
@@ -1540,6 +1408,7 @@ def mongo_profile_update_view(request):
                 latitude=float(request.POST.get('latitude', 0)) if request.POST.get('latitude') else None,
                 longitude=float(request.POST.get('longitude', 0)) if request.POST.get('longitude') else None
             )
+        user.address.point = geo_point(user.address.latitude, user.address.longitude)
 
         user.save()
         messages.success(request, 'Profile updated successfully!')
@@ -1559,6 +1428,9 @@ def mongo_update_donation_status_view(request, donation_id):
                 new_status = request.POST.get('status', 'available')
                 donation.status = new_status
                 donation.save()
+                sync_listing(donation)
+                invalidate_profile_dashboards(MongoDonor, donation.donor_id)
+                invalidate_profile_dashboards(MongoRecipient, donation.recipient_id)
                 messages.success(request, f'Donation status updated to {new_status}')
             else:
                 messages.error(request, 'Donation not found')
@@ -1596,6 +1468,7 @@ def mongo_update_activity_status_view(request, activity_id):
                     messages.success(request, 'Activity marked as available!')
                 
                 activity.save()
+                invalidate_dashboards(user.id)
             else:
                 messages.error(request, 'You can only update activities you created.')
         else:
@@ -1643,16 +1516,13 @@ def mongo_become_recipient_view(request):
         return redirect('login')
 
     # Check if user already has a recipient profile
-    existing_recipient = MongoRecipient.objects(user_id=user.id).first()
-    if existing_recipient:
+    roles = get_roles(user.id, request)
+    if roles.is_recipient:
         messages.info(request, 'You already have a recipient profile.')
         return redirect('recipient_dashboard')
 
     # Check if user has other profiles (but don't remove them)
-    donor = MongoDonor.objects(user_id=user.id).first()
-    volunteer = MongoVolunteer.objects(user_id=user.id).first()
-
-    if donor or volunteer:
+    if roles.is_donor or roles.is_volunteer:
         messages.info(request, 'You now have multiple profiles. You can switch between them from your dashboard.')
 
     # Create recipient profile
@@ -1661,6 +1531,7 @@ def mongo_become_recipient_view(request):
         shipping_address=user.address.street if user.address else ''
     )
     recipient.save()
+    invalidate_roles(request)
 
     messages.success(request, 'Recipient profile created successfully!')
     return redirect('recipient_dashboard')
@@ -1703,21 +1574,19 @@ def mongo_become_volunteer_view(request):
         return redirect('login')
 
     # Check if user already has a volunteer profile
-    existing_volunteer = MongoVolunteer.objects(user_id=user.id).first()
-    if existing_volunteer:
+    roles = get_roles(user.id, request)
+    if roles.is_volunteer:
         messages.info(request, 'You already have a volunteer profile.')
         return redirect('activity_list')
 
     # Check if user has other profiles (but don't remove them)
-    donor = MongoDonor.objects(user_id=user.id).first()
-    recipient = MongoRecipient.objects(user_id=user.id).first()
-
-    if donor or recipient:
+    if roles.is_donor or roles.is_recipient:
         messages.info(request, 'You now have multiple profiles. You can switch between them from your dashboard.')
 
     # Create volunteer profile
     volunteer = MongoVolunteer(user_id=user.id)
     volunteer.save()
+    invalidate_roles(request)
 
     messages.success(request, 'Volunteer profile created successfully!')
     return redirect('volunteer_dashboard')
@@ -1760,21 +1629,19 @@ def mongo_become_donor_view(request):
         return redirect('login')
 
     # Check if user already has a donor profile
-    existing_donor = MongoDonor.objects(user_id=user.id).first()
-    if existing_donor:
+    roles = get_roles(user.id, request)
+    if roles.is_donor:
         messages.info(request, 'You already have a donor profile.')
         return redirect('donor_dashboard')
 
     # Check if user has other profiles (but don't remove them)
-    recipient = MongoRecipient.objects(user_id=user.id).first()
-    volunteer = MongoVolunteer.objects(user_id=user.id).first()
-
-    if recipient or volunteer:
+    if roles.is_recipient or roles.is_volunteer:
         messages.info(request, 'You now have multiple profiles. You can switch between them from your dashboard.')
 
     # Create donor profile
     donor = MongoDonor(user_id=user.id)
     donor.save()
+    invalidate_roles(request)
 
     messages.success(request, 'Donor profile created successfully!')
     return redirect('donor_dashboard')
@@ -1801,6 +1668,9 @@ def mongo_claim_donation_view(request, donation_id):
                 donation.status = 'claimed'
                 donation.claimed_at = datetime.now()
                 donation.save()
+                remove_listing(donation.id)
+                invalidate_dashboards(user.id)
+                invalidate_profile_dashboards(MongoDonor, donation.donor_id)
                 messages.success(request, 'Donation claimed successfully!')
                 # --- Email Notifications ---
                 # Notify donor that their donation was claimed
@@ -1858,6 +1728,9 @@ def mongo_delete_donation_view(request, donation_id):
             donor = MongoDonor.objects(user_id=user.id).first()
             if donor and donation.donor_id == donor.id:
                 donation.delete()
+                remove_listing(donation.id)
+                invalidate_dashboards(user.id)
+                invalidate_profile_dashboards(MongoRecipient, donation.recipient_id)
                 messages.success(request, 'Donation deleted successfully!')
             else:
                 messages.error(request, 'You can only delete your own donations.')
@@ -1915,39 +1788,23 @@ def mongo_join_activity_view(request, activity_id):
     user = request.mongo_user
     try:
         from bson import ObjectId
-        activity = MongoActivity.objects(id=ObjectId(activity_id)).first()
-        if activity:
-            # Check if user is a volunteer
-            volunteer = MongoVolunteer.objects(user_id=user.id).first()
-            if volunteer:
-                # Check if already participating
-                existing_participation = MongoVolunteerActivity.objects(
-                    activity_id=activity.id,
-                    volunteer_id=volunteer.id
-                ).first()
-
-                if not existing_participation:
-                    # User has never joined this activity
-                    participation = MongoVolunteerActivity(
-                        activity_id=activity.id,
-                        volunteer_id=volunteer.id,
-                        participant_id=user.id,
-                        status='joined'
-                    )
-                    participation.save()
-                elif existing_participation.status == 'left':
-                    # User previously left, update status to joined
-                    existing_participation.status = 'joined'
-                    existing_participation.save()
-                    participation = existing_participation
-                else:
-                    messages.info(request, 'You are already participating in this activity.')
-                    return redirect('activity_list')
-                
-                # Send success message and email notifications for both join cases
+        # Check if user is a volunteer
+        volunteer = get_roles(user.id, request).volunteer
+        if volunteer:
+            # One conditional update takes a seat and updates the activity status
+            outcome, activity = join_activity(ObjectId(activity_id), volunteer.id, user.id)
+            if outcome == NOT_FOUND:
+                messages.error(request, 'Activity not found.')
+            elif outcome == ALREADY_JOINED:
+                messages.info(request, 'You are already participating in this activity.')
+            elif outcome == FULL:
+                messages.error(request, 'Sorry, this activity is already full.')
+            else:
                 messages.success(request, 'Successfully joined the activity!')
                 creator = MongoVolunteer.objects(id=activity.volunteer_id).first()
                 creator_user = MongoUser.objects(id=creator.user_id).first() if creator else None
+                # The joiner's list and the organizer's participant count changed
+                invalidate_dashboards(user.id, creator_user.id if creator_user else None)
                 
                 # --- Email Notifications ---
                 # Notify volunteer that they joined the activity
@@ -1959,37 +1816,18 @@ def mongo_join_activity_view(request, activity_id):
                 )
 
                 # Notify activity creator that someone joined their activity
-                creator = MongoVolunteer.objects(id=activity.volunteer_id).first()
-                if creator:
-                    creator_user = MongoUser.objects(id=creator.user_id).first()
-                    if creator_user:
-                        send_notification_email(
-                            "A new volunteer joined your activity",
-                            creator_user.email,
-                            "emails/activity_creator_notified.html",
-                            {"creator": creator_user, "volunteer": user, "activity": activity}
-                        )
-                
-                # Check if activity is now full and update status accordingly
-                current_participants = MongoVolunteerActivity.objects(
-                    activity_id=activity.id,
-                    status='joined'
-                ).count()
+                if creator_user:
+                    send_notification_email(
+                        "A new volunteer joined your activity",
+                        creator_user.email,
+                        "emails/activity_creator_notified.html",
+                        {"creator": creator_user, "volunteer": user, "activity": activity}
+                    )
                 
-                if current_participants >= activity.max_participants:
-                    # Activity is full, set status to completed
-                    activity.status = 'completed'
-                    activity.save()
+                if activity.status == 'completed':
                     messages.info(request, 'Activity is now full and marked as completed!')
-                elif activity.status == 'completed' and current_participants < activity.max_participants:
-                    # Activity was completed but now has space, set back to available
-                    activity.status = 'available'
-                    activity.save()
-                    messages.info(request, 'Activity now has space and is available again!')
-            else:
-                messages.error(request, 'You need to be a volunteer to join activities.')
         else:
-            messages.error(request, 'Activity not found.')
+            messages.error(request, 'You need to be a volunteer to join activities.')
     except Exception as e:
         messages.error(request, f'Error joining activity: {str(e)}')
 
@@ -2006,38 +1844,21 @@ def mongo_leave_activity_view(request, activity_id):
 
     try:
         from bson import ObjectId
-        activity = MongoActivity.objects(id=ObjectId(activity_id)).first()
-        if activity:
-            # Check if user is a volunteer
-            volunteer = MongoVolunteer.objects(user_id=user.id).first()
-            if volunteer:
-                participation = MongoVolunteerActivity.objects(
-                    activity_id=activity.id,
-                    volunteer_id=volunteer.id
-                ).first()
-
-                if participation:
-                    participation.status = 'left'
-                    participation.save()
-                    messages.success(request, 'Successfully left the activity.')
-                    
-                    # Check if activity should become available again
-                    current_participants = MongoVolunteerActivity.objects(
-                        activity_id=activity.id,
-                        status='joined'
-                    ).count()
-                    
-                    if activity.status == 'completed' and current_participants < activity.max_participants:
-                        # Activity was completed but now has space, set back to available
-                        activity.status = 'available'
-                        activity.save()
-                        messages.info(request, 'Activity now has space and is available again!')
-                else:
-                    messages.info(request, 'You are not participating in this activity.')
+        # Check if user is a volunteer
+        volunteer = get_roles(user.id, request).volunteer
+        if volunteer:
+            # The seat is released, and the status reopened, in the same operation
+            activity = leave_activity(ObjectId(activity_id), volunteer.id)
+            if activity:
+                invalidate_dashboards(user.id)
+                invalidate_profile_dashboards(MongoVolunteer, activity.volunteer_id)
+                messages.success(request, 'Successfully left the activity.')
+                if activity.joined_count == activity.max_participants - 1:
+                    messages.info(request, 'Activity now has space and is available again!')
             else:
-                messages.error(request, 'You need to be a volunteer to leave activities.')
+                messages.info(request, 'You are not participating in this activity.')
         else:
-            messages.error(request, 'Activity not found.')
+            messages.error(request, 'You need to be a volunteer to leave activities.')
     except Exception as e:
         messages.error(request, f'Error leaving activity: {str(e)}')
 
@@ -2065,7 +1886,10 @@ def mongo_delete_activity_view(request, activity_id):
             # Check if user is the volunteer who created the activity
             volunteer = MongoVolunteer.objects(user_id=user.id).first()
             if volunteer and activity.volunteer_id == volunteer.id:
+                participants = MongoVolunteerActivity.objects(activity_id=activity.id).distinct('participant_id')
                 activity.delete()
+                invalidate_activities()
+                invalidate_dashboards(user.id, *participants)
                 messages.success(request, 'Activity deleted successfully!')
             else:
                 messages.error(request, 'You can only delete activities you created.')
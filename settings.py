@@ -88,6 +88,9 @@ MONGODB_DATABASE = 'donation_management_db'
 MONGODB_HOST = 'localhost'
 MONGODB_PORT = 27017
 
+# Seconds between in-process refreshes of the admin metrics snapshot (0: a dashboard view refreshes snapshots older than five minutes)
+METRICS_REFRESH_SECONDS = int(os.environ.get('METRICS_REFRESH_SECONDS', '0'))
+
 # Keep SQLite for now during migration
 DATABASES = {
     'default': {
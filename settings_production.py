@@ -197,6 +197,9 @@ MONGODB_PORT = int(os.environ.get('MONGOPORT', '27017'))
 MONGODB_USER = os.environ.get('MONGOUSER', '')
 MONGODB_PASSWORD = os.environ.get('MONGOPASSWORD', '')
 
+# Seconds between in-process refreshes of the admin metrics snapshot (0: a dashboard view refreshes snapshots older than five minutes)
+METRICS_REFRESH_SECONDS = int(os.environ.get('METRICS_REFRESH_SECONDS', '0'))
+
 # Debug MongoDB configuration
 print(f"DEBUG: MONGODB_URI = {MONGODB_URI}")
 print(f"DEBUG: MONGODB_HOST = {MONGODB_HOST}")
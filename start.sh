@@ -13,6 +13,18 @@ mkdir -p /app/logs
 # Run database migrations (ignore errors for now)
 python manage.py migrate --settings=settings_production || echo "Migration failed, continuing..."
 
+# Build MongoDB indexes before serving requests (ignore errors for now)
+python manage.py sync_mongo_indexes --settings=settings_production || echo "MongoDB index sync failed, continuing..."
+
+# Fill the listings read model behind the item catalog when it is empty (first deploy or a fresh database)
+python manage.py rebuild_listings --if-empty --settings=settings_production || echo "Listings rebuild failed, continuing..."
+
+# Build GeoJSON points for "near me" from stored coordinates; only documents without a point are written
+python manage.py backfill_geo_points --settings=settings_production || echo "Geo point backfill failed, continuing..."
+
+# Bring activity joined_count counters (the capacity guard) in line with participations before serving joins
+python manage.py reconcile_activity_counts --settings=settings_production || echo "Activity count reconcile failed, continuing..."
+
 # Collect static files (ignore errors for now)
 python manage.py collectstatic --noinput --settings=settings_production || echo "Static collection failed, continuing..."
 
@@ -160,23 +160,24 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
-    // Monthly Trends Chart
+    // Daily Trends Chart
     const monthlyTrendsCtx = document.getElementById('monthlyTrendsChart');
-    if (monthlyTrendsCtx) {
+    if (monthlyTrendsCtx && chartData.volunteer_activity_trends) {
+        const dailyData = chartData.volunteer_activity_trends;
         new Chart(monthlyTrendsCtx.getContext('2d'), {
             type: 'line',
             data: {
-                labels: ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun'],
+                labels: dailyData.map(item => item.date),
                 datasets: [{
                     label: 'Donations',
-                    data: [5, 8, 12, 15, 18, chartData.total_donations || 0],
+                    data: dailyData.map(item => item.donations_created || 0),
                     borderColor: '#667eea',
                     backgroundColor: 'rgba(102, 126, 234, 0.1)',
                     tension: 0.4,
                     fill: true
                 }, {
-                    label: 'Users',
-                    data: [3, 6, 9, 12, 15, chartData.total_users || 0],
+                    label: 'Signups',
+                    data: dailyData.map(item => item.signups || 0),
                     borderColor: '#28a745',
                     backgroundColor: 'rgba(40, 167, 69, 0.1)',
                     tension: 0.4,
@@ -311,3 +312,26 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 });
+
+// All Donations table: further pages are rendered by the server and appended
+document.addEventListener('DOMContentLoaded', function() {
+    const loadMore = document.getElementById('load-more-donations');
+    if (!loadMore) {
+        return;
+    }
+    loadMore.addEventListener('click', function() {
+        loadMore.disabled = true;
+        fetch(loadMore.dataset.url + '?cursor=' + encodeURIComponent(loadMore.dataset.cursor), {credentials: 'same-origin'})
+            .then(response => response.json())
+            .then(data => {
+                document.getElementById('all-donations-rows').insertAdjacentHTML('beforeend', data.html);
+                if (data.next_cursor) {
+                    loadMore.dataset.cursor = data.next_cursor;
+                    loadMore.disabled = false;
+                } else {
+                    loadMore.remove();
+                }
+            })
+            .catch(() => { loadMore.disabled = false; });
+    });
+});
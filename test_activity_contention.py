@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+"""
+Contention test for joining activities
+Many volunteers join the same activity at once; the activity must never be
+oversubscribed and its counter must match the participations
+Run this against a development database; it cleans up the data it creates
+"""
+
+import os
+import sys
+import threading
+import django
+from pathlib import Path
+
+# Add the project directory to Python path
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR))
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+django.setup()
+
+from mongo_utils import connect_to_mongodb, get_mongodb_connection
+from mongo_models import User as MongoUser, Volunteer as MongoVolunteer, \
+    Activity as MongoActivity, VolunteerActivity as MongoVolunteerActivity
+from mongo_participation import join_activity, leave_activity, JOINED, ALREADY_JOINED, FULL
+from datetime import datetime, timedelta
+
+THREADS = 50
+CAPACITY = 10
+
+
+def create_fixture(volunteer_count, capacity):
+    """An activity with `capacity` seats and `volunteer_count` volunteers, all tagged for cleanup"""
+    tag = f'contention-{datetime.utcnow().timestamp()}'
+    volunteers = []
+    for i in range(volunteer_count):
+        user = MongoUser(
+            email=f'{tag}-{i}@example.org',
+            name=f'Contention {i}',
+            phone='000',
+            password_hash='!',
+        ).save()
+        volunteers.append(MongoVolunteer(user_id=user.id).save())
+    activity = MongoActivity(
+        title=tag,
+        description='Contention test',
+        category='Other',
+        location='Nowhere',
+        volunteer_id=volunteers[0].id,
+        activity_date=datetime.utcnow() + timedelta(days=1),
+        max_participants=capacity,
+    ).save()
+    return activity, volunteers
+
+
+def cleanup(activity, volunteers):
+    MongoVolunteerActivity.objects(activity_id=activity.id).delete()
+    activity.delete()
+    for volunteer in volunteers:
+        MongoUser.objects(id=volunteer.user_id).delete()
+        volunteer.delete()
+
+
+def run_concurrently(target, args_list):
+    """Start one thread per argument tuple behind a barrier so they hit the database together"""
+    barrier = threading.Barrier(len(args_list))
+    results = [None] * len(args_list)
+
+    def worker(index, args):
+        barrier.wait()
+        results[index] = target(*args)
+
+    threads = [threading.Thread(target=worker, args=(i, args)) for i, args in enumerate(args_list)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def check_activity(activity_id, expected_joined):
+    activity = MongoActivity.objects(id=activity_id).first()
+    joined_rows = MongoVolunteerActivity.objects(activity_id=activity_id, status='joined').count()
+    ok = activity.joined_count == expected_joined == joined_rows
+    print(f"{'✅' if ok else '❌'} joined_count={activity.joined_count}, joined rows={joined_rows}, "
+          f"expected={expected_joined}, status={activity.status}")
+    return ok, activity
+
+
+def test_mongodb_connection():
+    """Test MongoDB connection"""
+    print("Testing MongoDB connection...")
+    try:
+        connect_to_mongodb()
+        if get_mongodb_connection():
+            print("✅ MongoDB connection successful")
+            return True
+        else:
+            print("❌ MongoDB connection failed")
+            return False
+    except Exception as e:
+        print(f"❌ MongoDB connection error: {e}")
+        return False
+
+
+def test_concurrent_joins():
+    """More volunteers than seats join at the same time"""
+    print(f"\nTesting {THREADS} concurrent joins for {CAPACITY} seats...")
+    activity, volunteers = create_fixture(THREADS, CAPACITY)
+    try:
+        results = run_concurrently(join_activity, [(activity.id, v.id, v.user_id) for v in volunteers])
+        outcomes = [outcome for outcome, _ in results]
+        print(f"   joined={outcomes.count(JOINED)}, full={outcomes.count(FULL)}")
+        ok, activity = check_activity(activity.id, CAPACITY)
+        ok = ok and outcomes.count(JOINED) == CAPACITY and activity.status == 'completed'
+        return ok
+    except Exception as e:
+        print(f"❌ Concurrent join error: {e}")
+        return False
+    finally:
+        cleanup(activity, volunteers)
+
+
+def test_duplicate_joins():
+    """The same volunteer joins many times at once and takes exactly one seat"""
+    print(f"\nTesting {THREADS} concurrent joins by one volunteer...")
+    activity, volunteers = create_fixture(1, CAPACITY)
+    volunteer = volunteers[0]
+    try:
+        results = run_concurrently(join_activity, [(activity.id, volunteer.id, volunteer.user_id)] * THREADS)
+        outcomes = [outcome for outcome, _ in results]
+        print(f"   joined={outcomes.count(JOINED)}, already joined={outcomes.count(ALREADY_JOINED)}")
+        ok, _ = check_activity(activity.id, 1)
+        return ok and outcomes.count(JOINED) == 1
+    except Exception as e:
+        print(f"❌ Duplicate join error: {e}")
+        return False
+    finally:
+        cleanup(activity, volunteers)
+
+
+def test_leave_and_rejoin():
+    """Concurrent leaves free each seat once and reopen a full activity"""
+    print(f"\nTesting concurrent leaves and rejoins...")
+    activity, volunteers = create_fixture(CAPACITY, CAPACITY)
+    try:
+        for volunteer in volunteers:
+            join_activity(activity.id, volunteer.id, volunteer.user_id)
+        # Every volunteer tries to leave twice at the same time
+        run_concurrently(leave_activity, [(activity.id, v.id) for v in volunteers] * 2)
+        ok, activity = check_activity(activity.id, 0)
+        ok = ok and activity.status == 'available'
+
+        results = run_concurrently(join_activity, [(activity.id, v.id, v.user_id) for v in volunteers])
+        rejoined, activity = check_activity(activity.id, CAPACITY)
+        return ok and rejoined and all(outcome == JOINED for outcome, _ in results)
+    except Exception as e:
+        print(f"❌ Leave/rejoin error: {e}")
+        return False
+    finally:
+        cleanup(activity, volunteers)
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Testing activity join contention")
+    print("=" * 50)
+
+    if not test_mongodb_connection():
+        return False
+    # Duplicate joins are caught by the unique (activity_id, volunteer_id) index
+    MongoVolunteerActivity.ensure_indexes()
+    print()
+
+    tests = [
+        test_concurrent_joins,
+        test_duplicate_joins,
+        test_leave_and_rejoin,
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{total} tests passed")
+
+    if passed == total:
+        print("🎉 All tests passed! Joins are capacity-safe.")
+    else:
+        print("⚠️  Some tests failed. Please check the errors above.")
+
+    return passed == total
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
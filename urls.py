@@ -64,7 +64,7 @@ def welcome_view(request):
 from mongodb_only_views import (
     # Auth & Profile
     mongo_login_view, mongo_register_view, mongo_logout_view,
-    mongo_dashboard_view, mongo_profile_view, mongo_profile_update_view,
+    mongo_dashboard_view, mongo_recipient_available_donations, mongo_profile_view, mongo_profile_update_view,
     password_reset_start, password_reset_confirm,
 
     # Onboarding / compat
@@ -87,8 +87,8 @@ from mongodb_only_views import (
 )
 
 from mongodb_admin import (
-    mongo_admin_dashboard, mongo_admin_user_management,
-    mongo_admin_donation_management, mongo_admin_activity_management,
+    mongo_admin_dashboard, mongo_admin_refresh_metrics, mongo_admin_user_management,
+    mongo_admin_donation_management, mongo_admin_donations_table, mongo_admin_activity_management,
     mongo_admin_activity_logs,
     mongo_admin_delete_donation, mongo_admin_ship_donation,
 
@@ -165,18 +165,21 @@ urlpatterns += [
 urlpatterns += [
     path('dashboard/donor/',     mongo_dashboard_view, name='donor_dashboard'),
     path('dashboard/recipient/', mongo_dashboard_view, name='recipient_dashboard'),
+    path('dashboard/recipient/available/', mongo_recipient_available_donations, name='recipient_available_donations'),
     path('dashboard/volunteer/', mongo_dashboard_view, name='volunteer_dashboard'),
 ]
 
 # ---- MongoDB Admin ----
 urlpatterns += [
     path('admin-dashboard/', mongo_admin_dashboard, name='admin_dashboard'),
+    path('admin-dashboard/refresh-metrics/', mongo_admin_refresh_metrics, name='admin_refresh_metrics'),
     path('admin-users/', mongo_admin_user_management, name='admin_user_management'),
     path('admin-users/<str:user_id>/', mongo_admin_user_detail, name='admin_user_detail'),
     path('admin-users/<str:user_id>/toggle-status/', mongo_admin_toggle_user_status, name='admin_toggle_user_status'),
     path('admin-users/<str:user_id>/delete/', mongo_admin_delete_user, name='admin_delete_user'),
 
     path('admin-donations/', mongo_admin_donation_management, name='admin_donation_management'),
+    path('admin-donations/table/', mongo_admin_donations_table, name='admin_donations_table'),
     path('admin-donations/<str:donation_id>/ship/', mongo_admin_ship_donation, name='admin_ship_donation'),
     path('admin-donations/<str:donation_id>/delete/', mongo_admin_delete_donation, name='admin_delete_donation'),
 